@@ -2,33 +2,43 @@
 
 This package contains model implementations for VA analysis, including
 InSilicoVA and ML model implementations like XGBoost.
+
+Submodules are imported lazily on first attribute access, so importing the
+package does not pull in heavy dependencies (xgboost, torch, ...) for models
+that are never used.
 """
 
-from baseline.models.hyperparameter_tuning import (
-    XGBoostHyperparameterTuner,
-    quick_tune_xgboost,
-    CategoricalNBHyperparameterTuner,
-    quick_tune_categorical_nb,
-)
-from baseline.models.insilico_model import InSilicoVAModel
-from baseline.models.logistic_regression_config import LogisticRegressionConfig
-from baseline.models.logistic_regression_model import LogisticRegressionModel
-from baseline.models.model_config import InSilicoVAConfig
-from baseline.models.model_validator import InSilicoVAValidator, ModelValidationResult
-from baseline.models.random_forest_config import RandomForestConfig
-from baseline.models.random_forest_model import RandomForestModel
-from baseline.models.xgboost_config import XGBoostConfig
-from baseline.models.xgboost_model import XGBoostModel
-from baseline.models.categorical_nb_config import CategoricalNBConfig
-from baseline.models.categorical_nb_model import CategoricalNBModel
-from baseline.models.ensemble_config import EnsembleConfig
-from baseline.models.ensemble_model import DuckVotingEnsemble
-from baseline.models.tabicl_config import TabICLConfig
-from baseline.models.tabicl_model import TabICLModel
+import importlib
+from typing import Any
+
+_LAZY_IMPORTS = {
+    "XGBoostHyperparameterTuner": "baseline.models.hyperparameter_tuning",
+    "quick_tune_xgboost": "baseline.models.hyperparameter_tuning",
+    "CategoricalNBHyperparameterTuner": "baseline.models.hyperparameter_tuning",
+    "quick_tune_categorical_nb": "baseline.models.hyperparameter_tuning",
+    "InSilicoVAModel": "baseline.models.insilico_model",
+    "LogisticRegressionConfig": "baseline.models.logistic_regression_config",
+    "LogisticRegressionModel": "baseline.models.logistic_regression_model",
+    "InSilicoVAConfig": "baseline.models.model_config",
+    "make_insilico_config": "baseline.models.model_config",
+    "InSilicoVAValidator": "baseline.models.model_validator",
+    "ModelValidationResult": "baseline.models.model_validator",
+    "RandomForestConfig": "baseline.models.random_forest_config",
+    "RandomForestModel": "baseline.models.random_forest_model",
+    "XGBoostConfig": "baseline.models.xgboost_config",
+    "XGBoostModel": "baseline.models.xgboost_model",
+    "CategoricalNBConfig": "baseline.models.categorical_nb_config",
+    "CategoricalNBModel": "baseline.models.categorical_nb_model",
+    "EnsembleConfig": "baseline.models.ensemble_config",
+    "DuckVotingEnsemble": "baseline.models.ensemble_model",
+    "TabICLConfig": "baseline.models.tabicl_config",
+    "TabICLModel": "baseline.models.tabicl_model",
+}
 
 __all__ = [
     "InSilicoVAModel",
     "InSilicoVAConfig",
+    "make_insilico_config",
     "InSilicoVAValidator",
     "ModelValidationResult",
     "XGBoostModel",
@@ -47,4 +57,17 @@ __all__ = [
     "EnsembleConfig",
     "TabICLModel",
     "TabICLConfig",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the submodule defining ``name`` on first access (PEP 562)."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
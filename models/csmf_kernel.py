@@ -0,0 +1,75 @@
+"""Compiled kernel for CSMF accuracy on integer-coded cause labels.
+
+This module provides the CSMF accuracy computation shared by the VA models.
+Labels are expected to be pre-encoded as integers in ``[0, n_causes)``; the
+kernel is JIT-compiled with Numba when available, which matters when the
+metric is evaluated thousands of times in cross-validation or tuning sweeps.
+"""
+
+import numpy as np
+
+# Try to import Numba for JIT compilation
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _csmf_accuracy_numpy(
+    codes_true: np.ndarray, codes_pred: np.ndarray, n_causes: int
+) -> float:
+    """Compute CSMF accuracy from integer-coded labels with NumPy."""
+    csmf_true = np.bincount(codes_true, minlength=n_causes) / len(codes_true)
+    csmf_pred = np.bincount(codes_pred, minlength=n_causes) / len(codes_pred)
+    numerator = np.abs(csmf_pred - csmf_true).sum()
+    denominator = 2 * (1 - csmf_true.min())
+    return float(1 - numerator / denominator)
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, error_model="numpy")
+    def _csmf_accuracy_numba(
+        codes_true: np.ndarray, codes_pred: np.ndarray, n_causes: int
+    ) -> float:
+        """Compute CSMF accuracy from integer-coded labels in a compiled loop."""
+        csmf_true = np.zeros(n_causes)
+        csmf_pred = np.zeros(n_causes)
+        for code in codes_true:
+            csmf_true[code] += 1.0
+        for code in codes_pred:
+            csmf_pred[code] += 1.0
+        csmf_true /= len(codes_true)
+        csmf_pred /= len(codes_pred)
+        numerator = np.abs(csmf_pred - csmf_true).sum()
+        denominator = 2 * (1 - csmf_true.min())
+        return 1 - numerator / denominator
+
+
+def csmf_accuracy_from_codes(
+    codes_true: np.ndarray, codes_pred: np.ndarray, n_causes: int
+) -> float:
+    """Calculate CSMF accuracy from integer-coded cause labels.
+
+    Formula: 1 - sum(|pred_fraction - true_fraction|) / (2 * (1 - min(true_fraction)))
+
+    The minimum true fraction is taken over all ``n_causes`` codes, so causes
+    that only appear in predictions count as a true fraction of zero.
+    With a single cause the true and predicted fractions are identical and
+    the score is 1.
+
+    Args:
+        codes_true: True cause codes in [0, n_causes)
+        codes_pred: Predicted cause codes in [0, n_causes)
+        n_causes: Number of distinct cause codes
+
+    Returns:
+        Unclipped CSMF accuracy score
+    """
+    # Single class: the formula's denominator is zero
+    if n_causes == 1:
+        return 1.0
+    if NUMBA_AVAILABLE:
+        return float(_csmf_accuracy_numba(codes_true, codes_pred, n_causes))
+    return _csmf_accuracy_numpy(codes_true, codes_pred, n_causes)
@@ -0,0 +1,223 @@
+"""Persistent Docker container for InSilicoVA execution.
+
+This module provides a long-lived InSilicoVA container whose R process keeps
+openVA loaded and serves prediction requests over HTTP via plumber, avoiding
+the interpreter start-up and library load cost of a fresh ``docker run``.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from baseline.models.model_config import InSilicoVAConfig
+
+logger = logging.getLogger(__name__)
+
+# Static InSilicoVA R script, bind-mounted read-only into every container
+R_SCRIPT_PATH = Path(__file__).parent / "resources" / "run_insilico.R"
+CONTAINER_R_SCRIPT = "/opt/run_insilico.R"
+
+# Plumber API served inside the container. Each request sources the R script
+# against that call's data directory; quit() is shadowed so that an InSilicoVA
+# error fails the request instead of terminating the server.
+PLUMBER_API = """
+library(openVA)
+
+#* @get /health
+function() {
+    list(status = "ok")
+}
+
+#* @post /predict
+function(res, dir, shards = "0") {
+    Sys.setenv(DATA_DIR = file.path("/data", dir), SHARDS = shards)
+    env <- new.env()
+    env$quit <- function(...) stop("InSilicoVA execution failed")
+    status <- tryCatch({
+        source("/opt/run_insilico.R", local = env)
+        "ok"
+    }, error = function(e) {
+        res$status <- 500
+        as.character(e)
+    })
+    list(status = status)
+}
+"""
+
+
+class InSilicoVAContainer:
+    """Long-lived InSilicoVA container serving predictions over HTTP.
+
+    The container bind-mounts a persistent working directory at ``/data``.
+    Callers create per-call subdirectories inside ``work_dir``, write their
+    input files and parameters there, and request a prediction for that
+    subdirectory.
+    """
+
+    def __init__(self, config: InSilicoVAConfig):
+        """Initialize the container handle.
+
+        Args:
+            config: InSilicoVA model configuration
+        """
+        self.config = config
+        self.name = f"insilico-{uuid.uuid4().hex[:12]}"
+        self.work_dir: Optional[str] = None
+        self._base_url: Optional[str] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the container has been started and not stopped."""
+        return self.work_dir is not None
+
+    def start(self) -> None:
+        """Start the container and wait until the API is ready.
+
+        Raises:
+            RuntimeError: If the container fails to start or become ready
+        """
+        if self.is_running:
+            return
+
+        self.work_dir = tempfile.mkdtemp(
+            prefix="insilico-", dir=self.config.get_temp_base_dir()
+        )
+        with open(os.path.join(self.work_dir, "plumber_api.R"), "w") as f:
+            f.write(PLUMBER_API)
+
+        cmd = [
+            "docker", "run", "-d", "--rm",
+            "--name", self.name,
+            "--platform", self.config.docker_platform,
+            *self.config.get_docker_resource_args(),
+            "-p", "127.0.0.1::8000",
+            "-v", f"{os.path.abspath(self.work_dir)}:/data",
+            "-v", f"{R_SCRIPT_PATH}:{CONTAINER_R_SCRIPT}:ro",
+            self.config.docker_image,
+            "R", "-e",
+            "plumber::pr_run(plumber::pr('/data/plumber_api.R'), "
+            "host = '0.0.0.0', port = 8000)",
+        ]
+
+        logger.info(f"Starting persistent InSilicoVA container {self.name}")
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            self.stop()
+            raise RuntimeError(
+                f"Failed to start InSilicoVA container: {result.stderr}"
+            )
+
+        self._base_url = f"http://127.0.0.1:{self._get_host_port()}"
+        self._wait_until_ready()
+
+    def _get_host_port(self) -> str:
+        """Look up the ephemeral host port Docker published for the API.
+
+        Returns:
+            Host port mapped to the container's port 8000
+
+        Raises:
+            RuntimeError: If the port mapping cannot be read
+        """
+        result = subprocess.run(
+            ["docker", "port", self.name, "8000"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        # Output looks like "127.0.0.1:49153", one line per binding
+        mapping = result.stdout.strip().splitlines()
+        if result.returncode != 0 or not mapping:
+            self.stop()
+            raise RuntimeError(
+                f"Failed to read port of InSilicoVA container {self.name}: "
+                f"{result.stderr}"
+            )
+        return mapping[0].rsplit(":", 1)[1]
+
+    def _wait_until_ready(self, timeout: float = 120.0) -> None:
+        """Poll the health endpoint until the API responds.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Raises:
+            RuntimeError: If the API does not respond within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(f"{self._base_url}/health", timeout=5):
+                    logger.info(f"InSilicoVA container {self.name} is ready")
+                    return
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(1.0)
+
+        self.stop()
+        raise RuntimeError(
+            f"InSilicoVA container {self.name} not ready after {timeout}s"
+        )
+
+    def predict(self, call_dir: str, shards: list[int]) -> bool:
+        """Run InSilicoVA on the files in a per-call subdirectory.
+
+        Args:
+            call_dir: Directory inside ``work_dir`` containing input files
+            shards: Indices of the test data shards to process
+
+        Returns:
+            True if the prediction succeeded, False otherwise
+        """
+        if not self.is_running:
+            raise RuntimeError("InSilicoVA container is not running")
+
+        query = urllib.parse.urlencode({
+            "dir": os.path.basename(call_dir),
+            "shards": ",".join(map(str, shards)),
+        })
+        request = urllib.request.Request(
+            f"{self._base_url}/predict?{query}", method="POST"
+        )
+        try:
+            with urllib.request.urlopen(
+                request, timeout=self.config.docker_timeout
+            ):
+                return True
+        except urllib.error.HTTPError as e:
+            logger.error(f"InSilicoVA request failed: {e.read().decode()}")
+            return False
+        except (urllib.error.URLError, TimeoutError) as e:
+            logger.error(f"InSilicoVA request error: {str(e)}")
+            return False
+
+    def stop(self) -> None:
+        """Stop the container and remove its working directory."""
+        if not self.is_running:
+            return
+
+        logger.info(f"Stopping InSilicoVA container {self.name}")
+        try:
+            subprocess.run(
+                ["docker", "stop", self.name], capture_output=True, timeout=60
+            )
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.warning(f"Failed to stop container {self.name}: {str(e)}")
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.work_dir = None
+        self._base_url = None
+
+    def __enter__(self) -> "InSilicoVAContainer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
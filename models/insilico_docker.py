@@ -0,0 +1,466 @@
+"""Docker execution of the InSilicoVA R script.
+
+This module runs the InSilicoVA R script over prepared input files, either in
+fresh ``docker run`` containers (synchronously or awaited concurrently) or in
+a persistent container, and falls back to an image built from the local
+Dockerfile if configured.
+"""
+
+import asyncio
+import logging
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from baseline.models.insilico_container import (
+    CONTAINER_R_SCRIPT,
+    R_SCRIPT_PATH,
+    InSilicoVAContainer,
+)
+from baseline.models.insilico_io import read_probabilities
+from baseline.models.model_config import InSilicoVAConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _merge_group_results(
+    group_results: list[Optional[list[pd.DataFrame]]]
+) -> Optional[list[pd.DataFrame]]:
+    """Flatten per-container results, or return None if any container failed.
+    
+    Args:
+        group_results: Probability DataFrames returned by each container
+        
+    Returns:
+        DataFrames in shard order, or None if any container failed
+    """
+    if any(result is None for result in group_results):
+        return None
+    return [probs_df for result in group_results for probs_df in result]
+
+
+class InSilicoVADockerRunner:
+    """Run InSilicoVA in Docker containers over files in a data directory.
+    
+    Callers write the training data, test data shards and R parameters to a
+    directory and pass the shard indices processed by each container. The
+    runner never modifies its configuration, so one instance can serve
+    concurrent predictions.
+    """
+    
+    def __init__(self, config: InSilicoVAConfig):
+        """Initialize the runner.
+        
+        Args:
+            config: InSilicoVA model configuration
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self._docker_run_prefix: Optional[tuple[str, list[str], str]] = None
+    
+    def run(
+        self,
+        temp_dir: str,
+        shard_groups: list[list[int]],
+        container: Optional[InSilicoVAContainer] = None
+    ) -> list[pd.DataFrame]:
+        """Run InSilicoVA, one container per shard group, in threads.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shard_groups: Shard indices processed by each container
+            container: Persistent container to use instead of ``docker run``
+            
+        Returns:
+            DataFrames with probabilities in shard order
+            
+        Raises:
+            RuntimeError: If Docker execution fails
+        """
+        with self._docker_errors():
+            probs_dfs = self._run_shards(temp_dir, shard_groups, container)
+            if probs_dfs is None:
+                probs_dfs = self._run_fallback(temp_dir, shard_groups)
+        
+        return self._require_predictions(probs_dfs)
+    
+    async def arun(
+        self,
+        temp_dir: str,
+        shard_groups: list[list[int]],
+        container: Optional[InSilicoVAContainer] = None
+    ) -> list[pd.DataFrame]:
+        """Run InSilicoVA, one container per shard group, awaited concurrently.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shard_groups: Shard indices processed by each container
+            container: Persistent container to use instead of ``docker run``
+            
+        Returns:
+            DataFrames with probabilities in shard order
+            
+        Raises:
+            RuntimeError: If Docker execution fails
+        """
+        with self._docker_errors():
+            probs_dfs = await self._arun_shards(temp_dir, shard_groups, container)
+            if probs_dfs is None:
+                probs_dfs = await asyncio.to_thread(
+                    self._run_fallback, temp_dir, shard_groups
+                )
+        
+        return self._require_predictions(probs_dfs)
+    
+    @contextmanager
+    def _docker_errors(self) -> Iterator[None]:
+        """Convert exceptions raised while running Docker into RuntimeError.
+        
+        Raises:
+            RuntimeError: If the wrapped block raises
+        """
+        try:
+            yield
+        except Exception as e:
+            self.logger.error(f"Docker execution failed: {str(e)}")
+            raise RuntimeError(f"InSilicoVA Docker execution failed: {str(e)}")
+    
+    def _run_fallback(
+        self, temp_dir: str, shard_groups: list[list[int]]
+    ) -> Optional[list[pd.DataFrame]]:
+        """Retry with an image built from the local Dockerfile if configured.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shard_groups: Shard indices processed by each container
+            
+        Returns:
+            DataFrames with probabilities, or None if disabled or failed
+        """
+        if not self.config.use_fallback_dockerfile:
+            return None
+        self.logger.info("Primary Docker image failed, trying fallback Dockerfile")
+        return self._try_fallback_docker(temp_dir, shard_groups)
+    
+    @staticmethod
+    def _require_predictions(
+        probs_dfs: Optional[list[pd.DataFrame]]
+    ) -> list[pd.DataFrame]:
+        """Return the predictions, raising if every attempt failed.
+        
+        Args:
+            probs_dfs: Probability DataFrames, or None if execution failed
+            
+        Returns:
+            The probability DataFrames
+            
+        Raises:
+            RuntimeError: If no predictions were produced
+        """
+        if probs_dfs is None:
+            raise RuntimeError("Failed to get predictions from InSilicoVA")
+        return probs_dfs
+    
+    def _run_shards(
+        self,
+        temp_dir: str,
+        shard_groups: list[list[int]],
+        container: Optional[InSilicoVAContainer] = None,
+        image: Optional[str] = None
+    ) -> Optional[list[pd.DataFrame]]:
+        """Run one Docker container per shard group concurrently.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shard_groups: Shard indices processed by each container
+            container: Persistent container to use instead of ``docker run``
+            image: Image to run instead of the configured one
+            
+        Returns:
+            DataFrames with probabilities in shard order, or None if any
+            container failed
+        """
+        if len(shard_groups) == 1:
+            return self._run_docker_command(
+                temp_dir, shard_groups[0], container, image
+            )
+        
+        self.logger.info(f"Running InSilicoVA across {len(shard_groups)} containers")
+        with ThreadPoolExecutor(max_workers=len(shard_groups)) as executor:
+            group_results = list(
+                executor.map(
+                    lambda shards: self._run_docker_command(
+                        temp_dir, shards, container, image
+                    ),
+                    shard_groups,
+                )
+            )
+        
+        return _merge_group_results(group_results)
+    
+    async def _arun_shards(
+        self,
+        temp_dir: str,
+        shard_groups: list[list[int]],
+        container: Optional[InSilicoVAContainer] = None
+    ) -> Optional[list[pd.DataFrame]]:
+        """Run one Docker container per shard group, awaited concurrently.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shard_groups: Shard indices processed by each container
+            container: Persistent container to use instead of ``docker run``
+            
+        Returns:
+            DataFrames with probabilities in shard order, or None if any
+            container failed
+        """
+        group_results = await asyncio.gather(*(
+            self._arun_docker_command(temp_dir, shards, container)
+            for shards in shard_groups
+        ))
+        return _merge_group_results(group_results)
+    
+    def _run_docker_command(
+        self,
+        temp_dir: str,
+        shards: list[int],
+        container: Optional[InSilicoVAContainer] = None,
+        image: Optional[str] = None
+    ) -> Optional[list[pd.DataFrame]]:
+        """Run Docker command for InSilicoVA execution.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shards: Indices of the test data shards to process
+            container: Persistent container to use instead of ``docker run``
+            image: Image to run instead of the configured one
+            
+        Returns:
+            DataFrames with probabilities per shard or None if failed
+        """
+        if container is not None:
+            if not container.predict(temp_dir, shards):
+                return None
+            return read_probabilities(temp_dir, shards)
+        
+        cmd = self._build_docker_command(temp_dir, shards, image)
+        
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=self.config.docker_timeout
+            )
+            return self._handle_docker_result(
+                temp_dir, shards, result.returncode, result.stdout, result.stderr
+            )
+        except Exception as e:
+            self._log_docker_error(e)
+            return None
+    
+    async def _arun_docker_command(
+        self,
+        temp_dir: str,
+        shards: list[int],
+        container: Optional[InSilicoVAContainer] = None
+    ) -> Optional[list[pd.DataFrame]]:
+        """Run Docker command for InSilicoVA execution as an awaitable.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shards: Indices of the test data shards to process
+            container: Persistent container to use instead of ``docker run``
+            
+        Returns:
+            DataFrames with probabilities per shard or None if failed
+        """
+        if container is not None:
+            return await asyncio.to_thread(
+                self._run_docker_command, temp_dir, shards, container
+            )
+        
+        cmd = self._build_docker_command(temp_dir, shards)
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(), timeout=self.config.docker_timeout
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise
+            return self._handle_docker_result(
+                temp_dir, shards, process.returncode, stdout.decode(), stderr.decode()
+            )
+        except Exception as e:
+            self._log_docker_error(e)
+            return None
+    
+    def _build_docker_command(
+        self, temp_dir: str, shards: list[int], image: Optional[str] = None
+    ) -> list[str]:
+        """Build the docker run command for a group of shards.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shards: Indices of the test data shards to process
+            image: Image to run instead of the configured one
+            
+        Returns:
+            Command as a list of arguments
+        """
+        prefix, image_ref = self._get_docker_run_prefix(
+            image or self.config.docker_image
+        )
+        cmd = [
+            *prefix,
+            "-v", f"{os.path.abspath(temp_dir)}:/data",
+            "-e", f"SHARDS={','.join(map(str, shards))}",
+            image_ref,
+            "R", "-f", CONTAINER_R_SCRIPT
+        ]
+        self.logger.debug(f"Running Docker command: {' '.join(cmd)}")
+        return cmd
+    
+    def _handle_docker_result(
+        self,
+        temp_dir: str,
+        shards: list[int],
+        returncode: Optional[int],
+        stdout: str,
+        stderr: str
+    ) -> Optional[list[pd.DataFrame]]:
+        """Log Docker output and read the probabilities if the command succeeded.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shards: Indices of the test data shards processed
+            returncode: Exit code of the docker run command
+            stdout: Captured standard output
+            stderr: Captured standard error
+            
+        Returns:
+            DataFrames with probabilities per shard or None if failed
+        """
+        if self.config.verbose:
+            if stdout:
+                self.logger.info(f"Docker stdout:\n{stdout}")
+            if stderr:
+                self.logger.warning(f"Docker stderr:\n{stderr}")
+        
+        if returncode != 0:
+            self.logger.error(
+                f"Docker command failed with return code {returncode}"
+            )
+            return None
+        
+        return read_probabilities(temp_dir, shards)
+    
+    def _log_docker_error(self, error: Exception) -> None:
+        """Log an exception raised while running a Docker container.
+        
+        Args:
+            error: Exception from the sync or async subprocess call
+        """
+        if isinstance(error, (subprocess.TimeoutExpired, asyncio.TimeoutError)):
+            self.logger.error(
+                f"Docker execution timed out after {self.config.docker_timeout}s"
+            )
+        else:
+            self.logger.error(f"Docker execution error: {str(error)}")
+    
+    def _get_docker_run_prefix(self, image: str) -> tuple[list[str], str]:
+        """Get the fixed docker run arguments and the image reference to run.
+        
+        The image is resolved to its local image ID once and run with
+        ``--pull=never``, skipping tag resolution on every call. If the image
+        is not available locally, the tag is used so Docker can pull it. The
+        result is cached for the most recently used image.
+        
+        Args:
+            image: Docker image name or SHA
+            
+        Returns:
+            Tuple of (docker run argument prefix, image reference)
+        """
+        cached = self._docker_run_prefix
+        if cached is None or cached[0] != image:
+            prefix = ["docker", "run", "--rm", "--platform", self.config.docker_platform]
+            prefix.extend(self.config.get_docker_resource_args())
+            prefix.extend(["-v", f"{R_SCRIPT_PATH}:{CONTAINER_R_SCRIPT}:ro"])
+            image_ref = image
+            try:
+                inspect = subprocess.run(
+                    ["docker", "image", "inspect", "--format", "{{.Id}}", image],
+                    capture_output=True,
+                    text=True,
+                    timeout=10
+                )
+                if inspect.returncode == 0 and inspect.stdout.strip():
+                    prefix.append("--pull=never")
+                    image_ref = inspect.stdout.strip()
+            except (subprocess.SubprocessError, OSError) as e:
+                self.logger.debug(f"Could not resolve image ID for {image}: {e}")
+            cached = (image, prefix, image_ref)
+            self._docker_run_prefix = cached
+        
+        _, prefix, image_ref = cached
+        return prefix, image_ref
+    
+    def _try_fallback_docker(
+        self, temp_dir: str, shard_groups: list[list[int]]
+    ) -> Optional[list[pd.DataFrame]]:
+        """Try building and running from local Dockerfile.
+        
+        Args:
+            temp_dir: Directory containing input/output files
+            shard_groups: Shard indices processed by each container
+            
+        Returns:
+            DataFrames with probabilities or None if failed
+        """
+        # Check if Dockerfile exists
+        dockerfile_path = Path("Dockerfile")
+        if not dockerfile_path.exists():
+            self.logger.error("Dockerfile not found for fallback")
+            return None
+        
+        # Build image
+        build_tag = "insilicova-local:latest"
+        build_cmd = ["docker", "build", "-f", "Dockerfile", "-t", build_tag, "."]
+        
+        self.logger.info("Building InSilicoVA image from Dockerfile")
+        try:
+            build_result = subprocess.run(
+                build_cmd,
+                capture_output=True,
+                text=True,
+                timeout=600  # 10 minutes for build
+            )
+            
+            if build_result.returncode != 0:
+                self.logger.error(
+                    f"Docker build failed: {build_result.stderr}"
+                )
+                return None
+            
+            # Retry in fresh containers with the local image, without touching
+            # the shared config that concurrent predictions may be reading
+            return self._run_shards(temp_dir, shard_groups, image=build_tag)
+            
+        except Exception as e:
+            self.logger.error(f"Fallback Docker build/run failed: {str(e)}")
+            return None
@@ -0,0 +1,104 @@
+"""CSV exchange between the InSilicoVA model and its Docker containers.
+
+This module serializes training and test data to the CSV layout read by the
+InSilicoVA R script and reads back the probabilities it writes.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import pandas as pd
+
+# Try to import PyArrow for faster CSV I/O
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def to_csv_bytes(
+    X: pd.DataFrame, 
+    cause_column: str, 
+    causes: Optional[pd.Series] = None
+) -> bytes:
+    """Serialize features and a cause column to CSV with missing values as "".
+    
+    Empty strings preserve the OpenVA encoding of missing symptoms. With
+    PyArrow available, each column is converted directly into an Arrow string
+    array (offsets + bytes rather than Python objects) and written by the
+    multi-threaded Arrow CSV writer, avoiding an intermediate DataFrame copy.
+    
+    Args:
+        X: Feature DataFrame
+        cause_column: Name of the cause column appended after the features
+        causes: Cause labels, or None for an empty cause column (test data)
+        
+    Returns:
+        CSV content as bytes
+    """
+    if causes is None:
+        causes = pd.Series("", index=X.index)
+    
+    if PYARROW_AVAILABLE:
+        arrays = [
+            pc.fill_null(pa.array(X[col].astype("string"), type=pa.string()), "")
+            for col in X.columns
+        ]
+        arrays.append(pa.array(causes.astype(str), type=pa.string()))
+        table = pa.Table.from_arrays(
+            arrays, names=[*map(str, X.columns), cause_column]
+        )
+        sink = pa.BufferOutputStream()
+        pacsv.write_csv(table, sink)
+        return sink.getvalue().to_pybytes()
+    
+    data = X.assign(**{cause_column: causes.astype(str).to_numpy()})
+    return data.fillna("").to_csv(index=False).encode()
+
+
+def read_r_csv(path: str) -> pd.DataFrame:
+    """Read a CSV written by R's write.csv, using the first column as index.
+    
+    Args:
+        path: Input CSV path
+        
+    Returns:
+        DataFrame indexed by the first column
+    """
+    if PYARROW_AVAILABLE:
+        df = pacsv.read_csv(path).to_pandas()
+        return df.set_index(df.columns[0])
+    
+    return pd.read_csv(path, index_col=0)
+
+
+def read_probabilities(
+    temp_dir: str, shards: list[int]
+) -> Optional[list[pd.DataFrame]]:
+    """Read the probability outputs written by the R script.
+    
+    Args:
+        temp_dir: Directory containing input/output files
+        shards: Indices of the test data shards
+        
+    Returns:
+        DataFrames with probabilities or None if any file is missing
+    """
+    probs_dfs = []
+    for shard in shards:
+        probs_file = os.path.join(temp_dir, f"insilico_probs_{shard}.csv")
+        if not os.path.exists(probs_file):
+            logger.error(f"Output file not found: {probs_file}")
+            return None
+        
+        probs_df = read_r_csv(probs_file)
+        logger.info(f"Successfully loaded predictions: {probs_df.shape}")
+        probs_dfs.append(probs_df)
+    
+    return probs_dfs
@@ -5,17 +5,22 @@ the InSilicoVA algorithm via Docker containers and provides predictions
 for VA cause-of-death classification.
 """
 
+import asyncio
 import logging
 import os
-import subprocess
 import tempfile
-from pathlib import Path
-from typing import Optional
+import threading
+from functools import cached_property
+from typing import ClassVar, Optional
 
 import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator
 
+from baseline.models.csmf_kernel import csmf_accuracy_from_codes
+from baseline.models.insilico_container import InSilicoVAContainer
+from baseline.models.insilico_docker import InSilicoVADockerRunner
+from baseline.models.insilico_io import to_csv_bytes
 from baseline.models.model_config import InSilicoVAConfig
 from baseline.models.model_validator import InSilicoVAValidator
 
@@ -28,8 +33,16 @@ class InSilicoVAModel(BaseEstimator):
     This model implements the InSilicoVA algorithm for verbal autopsy
     cause-of-death prediction using Docker containers to handle the
     complex R/Java dependencies.
+    
+    With ``container_mode="persistent"`` a single warm container is started on
+    the first prediction and reused across predictions; call ``close()`` or
+    use the model as a context manager to stop it. Pickled or copied models
+    do not share the container and start their own.
     """
     
+    # Serializes lazy container start-up across threads and instances
+    _container_lock: ClassVar[threading.Lock] = threading.Lock()
+    
     def __init__(self, config: Optional[InSilicoVAConfig] = None):
         """Initialize the InSilicoVA model.
         
@@ -42,11 +55,14 @@ class InSilicoVAModel(BaseEstimator):
         
         # Model state
         self.is_fitted = False
-        self.train_data: Optional[pd.DataFrame] = None
+        self._train_csv_bytes: Optional[bytes] = None
         self._unique_causes: Optional[list[str]] = None
+        self._unique_causes_array: Optional[np.ndarray] = None
         self._feature_columns: Optional[list[str]] = None
+        self._container: Optional[InSilicoVAContainer] = None
         
-        # Validate Docker availability on initialization
+        # Validate Docker availability on initialization (cached by the
+        # validator for DOCKER_CHECK_TTL seconds per image)
         docker_result = self.validator.validate_docker_availability()
         if not docker_result.is_valid:
             self.logger.warning(
@@ -54,6 +70,82 @@ class InSilicoVAModel(BaseEstimator):
                 "Model may not work properly."
             )
     
+    @property
+    def config(self) -> InSilicoVAConfig:
+        """Model configuration."""
+        return self._config
+    
+    @config.setter
+    def config(self, value: InSilicoVAConfig) -> None:
+        self._config = value
+        # Invalidate state derived from the configuration
+        self.__dict__.pop("_r_params_dcf", None)
+        self.__dict__.pop("_runner", None)
+    
+    @cached_property
+    def _r_params_dcf(self) -> str:
+        """R script parameters serialized once per configuration.
+        
+        Parameters are written as a DCF (``key: value``) record that base R
+        reads with ``read.dcf``, so images need no extra R packages.
+        """
+        params = self.config.get_r_script_params()
+        return "".join(f"{key}: {value}\n" for key, value in params.items())
+    
+    @cached_property
+    def _runner(self) -> InSilicoVADockerRunner:
+        """Docker runner for the current configuration."""
+        return InSilicoVADockerRunner(self.config)
+    
+    @classmethod
+    def refresh_docker_check(cls) -> None:
+        """Clear cached Docker availability results.
+        
+        The next model initialization re-runs the Docker checks, e.g. after
+        starting the Docker daemon or building the image.
+        """
+        InSilicoVAValidator.clear_docker_cache()
+    
+    def _ensure_container(self) -> None:
+        """Start the persistent container on first use if configured.
+        
+        Raises:
+            RuntimeError: If the container fails to start
+        """
+        if self.config.container_mode != "persistent" or self._container is not None:
+            return
+        with self._container_lock:
+            if self._container is None:
+                container = InSilicoVAContainer(self.config)
+                container.start()
+                self._container = container
+    
+    def close(self) -> None:
+        """Stop the persistent container if one is running."""
+        if self._container is not None:
+            self._container.stop()
+            self._container = None
+    
+    def __enter__(self) -> "InSilicoVAModel":
+        return self
+    
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+    
+    def __del__(self) -> None:
+        if getattr(self, "_container", None) is not None:
+            self.close()
+    
+    def __getstate__(self) -> dict:
+        """Exclude the persistent container from pickling and deep copies.
+        
+        Only the instance that started the container owns it; copies start
+        their own container on first prediction.
+        """
+        state = dict(super().__getstate__())
+        state["_container"] = None
+        return state
+    
     def fit(self, X: pd.DataFrame, y: pd.Series) -> "InSilicoVAModel":
         """Fit the model using training data.
         
@@ -80,10 +172,10 @@ class InSilicoVAModel(BaseEstimator):
         for warning in validation_result.warnings:
             self.logger.warning(warning)
         
-        # Store training data for Docker execution
-        self.train_data = X.copy()
-        self.train_data[self.config.cause_column] = y.astype(str)
+        # Serialize training data once; it is reused by every prediction
+        self._train_csv_bytes = to_csv_bytes(X, self.config.cause_column, y)
         self._unique_causes = sorted(y.astype(str).unique())
+        self._unique_causes_array = np.asarray(self._unique_causes)
         self._feature_columns = X.columns.tolist()
         self.is_fitted = True
         
@@ -113,17 +205,48 @@ class InSilicoVAModel(BaseEstimator):
         proba = self.predict_proba(X)
         
         # Convert to class predictions (highest probability)
-        if self._unique_causes is None:
+        if self._unique_causes_array is None:
             raise RuntimeError("Model not fitted - unique causes not available")
             
         predicted_indices = np.argmax(proba, axis=1)
-        predictions = np.array([self._unique_causes[idx] for idx in predicted_indices])
+        predictions = self._unique_causes_array[predicted_indices]
         
         return predictions
     
     def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
         """Get probability predictions using fitted model.
         
+        InSilicoVA estimates the CSMF of the test population jointly with the
+        individual probabilities. With ``num_shards > 1`` or
+        ``deduplicate_rows`` enabled, the CSMF is estimated per shard or over
+        unique rows, so probabilities differ from a single run over all rows.
+        
+        Args:
+            X: Feature DataFrame for prediction
+            
+        Returns:
+            Array of shape (n_samples, n_classes) with probability predictions
+            
+        Raises:
+            ValueError: If model is not fitted or prediction fails
+            RuntimeError: If Docker execution fails
+        """
+        shards, inverse = self._prepare_shards(X)
+        
+        # Execute InSilicoVA via Docker
+        self._ensure_container()
+        with tempfile.TemporaryDirectory(dir=self._get_temp_base_dir()) as temp_dir:
+            probs_dfs = self._execute_insilico(shards, str(temp_dir))
+        
+        return self._combine_probabilities(probs_dfs, inverse)
+    
+    async def apredict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        """Get probability predictions without blocking the event loop.
+        
+        Equivalent to ``predict_proba`` but awaits the Docker containers, so
+        several independent datasets can be predicted concurrently, e.g.
+        ``await asyncio.gather(*(model.apredict_proba(X) for X in batches))``.
+        
         Args:
             X: Feature DataFrame for prediction
             
@@ -134,6 +257,113 @@ class InSilicoVAModel(BaseEstimator):
             ValueError: If model is not fitted or prediction fails
             RuntimeError: If Docker execution fails
         """
+        shards, inverse = await asyncio.to_thread(self._prepare_shards, X)
+        
+        await asyncio.to_thread(self._ensure_container)
+        with tempfile.TemporaryDirectory(dir=self._get_temp_base_dir()) as temp_dir:
+            probs_dfs = await self._aexecute_insilico(shards, str(temp_dir))
+        
+        return self._combine_probabilities(probs_dfs, inverse)
+    
+    def _prepare_shards(
+        self, X: pd.DataFrame
+    ) -> tuple[list[pd.DataFrame], Optional[np.ndarray]]:
+        """Validate, deduplicate and shard prediction data.
+        
+        Args:
+            X: Feature DataFrame for prediction
+            
+        Returns:
+            Tuple of (test data shards run by concurrent containers, index
+            array mapping each original row to its unique row or None)
+        """
+        X_aligned = self._prepare_prediction_data(X)
+        X_aligned, inverse = self._deduplicate_rows(X_aligned)
+        
+        self.logger.info(f"Running InSilicoVA prediction for {len(X)} samples")
+        
+        return self._split_into_shards(X_aligned), inverse
+    
+    def _combine_probabilities(
+        self, probs_dfs: list[pd.DataFrame], inverse: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """Combine per-shard probabilities into one array for all input rows.
+        
+        Args:
+            probs_dfs: Probability DataFrames in shard order
+            inverse: Index array from deduplication, or None
+            
+        Returns:
+            Array of shape (n_samples, n_classes) with probability predictions
+        """
+        # Convert to numpy array with consistent ordering
+        probs_array = self._format_probabilities(pd.concat(probs_dfs))
+        
+        # Broadcast probabilities of unique rows back to all rows
+        if inverse is not None:
+            probs_array = probs_array[inverse]
+        
+        return probs_array
+    
+    def predict_proba_batch(self, Xs: list[pd.DataFrame]) -> list[np.ndarray]:
+        """Get probability predictions for several test sets in one R session.
+        
+        All test sets are processed sequentially by a single container, so
+        the openVA library load is paid once instead of once per test set.
+        Useful when predicting on many bootstrap or cross-validation folds.
+        
+        Args:
+            Xs: List of feature DataFrames for prediction
+            
+        Returns:
+            List of arrays of shape (n_samples_i, n_classes), one per test set
+            
+        Raises:
+            ValueError: If model is not fitted or prediction fails
+            RuntimeError: If Docker execution fails
+        """
+        if not Xs:
+            return []
+        
+        X_aligned = [self._prepare_prediction_data(X) for X in Xs]
+        
+        self.logger.info(
+            f"Running InSilicoVA prediction for {len(Xs)} test sets "
+            f"({sum(len(X) for X in Xs)} samples)"
+        )
+        
+        self._ensure_container()
+        with tempfile.TemporaryDirectory(dir=self._get_temp_base_dir()) as temp_dir:
+            probs_dfs = self._execute_insilico(X_aligned, str(temp_dir), batched=True)
+        
+        return [self._format_probabilities(probs_df) for probs_df in probs_dfs]
+    
+    def _get_temp_base_dir(self) -> Optional[str]:
+        """Get the parent directory for per-call temporary directories.
+        
+        Persistent containers only see their own bind-mounted working
+        directory; otherwise a RAM-backed tmpfs is preferred so data
+        exchanged with Docker never touches disk.
+        
+        Returns:
+            Directory path, or None to use the system default
+        """
+        if self._container is not None:
+            return self._container.work_dir
+        return self.config.get_temp_base_dir()
+    
+    def _prepare_prediction_data(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Validate prediction data and align its columns with training data.
+        
+        Args:
+            X: Feature DataFrame for prediction
+            
+        Returns:
+            DataFrame with columns in training order
+            
+        Raises:
+            ValueError: If model is not fitted or data is invalid
+        """
         if not self.is_fitted:
             raise ValueError("Model must be fitted before prediction")
         
@@ -156,19 +386,11 @@ class InSilicoVAModel(BaseEstimator):
                 f"Column mismatch: {'; '.join(col_validation.errors)}"
             )
         
-        # Ensure columns are in same order as training
-        X_aligned = X[self._feature_columns].copy()
-        
-        self.logger.info(f"Running InSilicoVA prediction for {len(X)} samples")
-        
-        # Execute InSilicoVA via Docker
-        with tempfile.TemporaryDirectory() as temp_dir:
-            probs_df = self._execute_insilico(X_aligned, str(temp_dir))
-        
-        # Convert to numpy array with consistent ordering
-        probs_array = self._format_probabilities(probs_df)
-        
-        return probs_array
+        # Ensure columns are in same order as training; inputs are only read
+        # for serialization, so no copy is needed
+        if X.columns.tolist() == self._feature_columns:
+            return X
+        return X[self._feature_columns]
     
     def calculate_csmf_accuracy(
         self, 
@@ -190,23 +412,19 @@ class InSilicoVAModel(BaseEstimator):
             CSMF accuracy score between 0 and 1
         """
         # Ensure both series have the same data type (convert to string for consistency)
-        y_true_str = y_true.astype(str)
-        y_pred_str = y_pred.astype(str)
-        
-        # Calculate true and predicted CSMFs
-        csmf_true = y_true_str.value_counts(normalize=True).sort_index()
-        csmf_pred = y_pred_str.value_counts(normalize=True).sort_index()
+        y_true_str = np.asarray(y_true).astype(str)
+        y_pred_str = np.asarray(y_pred).astype(str)
         
-        # Align indices to handle missing causes
-        all_causes = sorted(set(csmf_true.index) | set(csmf_pred.index))
-        csmf_true_aligned = csmf_true.reindex(all_causes, fill_value=0)
-        csmf_pred_aligned = csmf_pred.reindex(all_causes, fill_value=0)
-        
-        # Calculate CSMF accuracy
-        numerator = np.sum(np.abs(csmf_pred_aligned - csmf_true_aligned))
-        denominator = 2 * (1 - np.min(csmf_true_aligned))
+        # Encode labels over the union of true and predicted causes
+        all_causes, codes = np.unique(
+            np.concatenate([y_true_str, y_pred_str]), return_inverse=True
+        )
+        n_true = len(y_true_str)
         
-        accuracy = 1 - (numerator / denominator)
+        # Calculate CSMF accuracy on the integer codes
+        accuracy = csmf_accuracy_from_codes(
+            codes[:n_true], codes[n_true:], len(all_causes)
+        )
         
         self.logger.info(f"CSMF accuracy: {accuracy:.3f}")
         
@@ -214,233 +432,156 @@ class InSilicoVAModel(BaseEstimator):
     
     def _execute_insilico(
         self, 
-        X: pd.DataFrame, 
-        temp_dir: str
-    ) -> pd.DataFrame:
+        test_sets: list[pd.DataFrame], 
+        temp_dir: str,
+        batched: bool = False
+    ) -> list[pd.DataFrame]:
         """Execute InSilicoVA via Docker container.
         
         Args:
-            X: Feature DataFrame for prediction
+            test_sets: Feature DataFrames for prediction
+            temp_dir: Temporary directory for file I/O
+            batched: If True, process all test sets in a single container;
+                otherwise run one container per test set concurrently
+                
+        Returns:
+            List of DataFrames with probability predictions, one per test set
+            
+        Raises:
+            RuntimeError: If Docker execution fails
+        """
+        shard_groups = self._write_inputs(test_sets, temp_dir, batched)
+        return self._runner.run(temp_dir, shard_groups, self._container)
+    
+    async def _aexecute_insilico(
+        self, 
+        test_sets: list[pd.DataFrame], 
+        temp_dir: str
+    ) -> list[pd.DataFrame]:
+        """Execute InSilicoVA via Docker containers awaited concurrently.
+        
+        Args:
+            test_sets: Feature DataFrames for prediction, one container each
             temp_dir: Temporary directory for file I/O
             
         Returns:
-            DataFrame with probability predictions
+            List of DataFrames with probability predictions, one per test set
             
         Raises:
             RuntimeError: If Docker execution fails
         """
+        shard_groups = await asyncio.to_thread(
+            self._write_inputs, test_sets, temp_dir
+        )
+        return await self._runner.arun(temp_dir, shard_groups, self._container)
+    
+    def _write_inputs(
+        self, 
+        test_sets: list[pd.DataFrame], 
+        temp_dir: str,
+        batched: bool = False
+    ) -> list[list[int]]:
+        """Write training data, test data and R parameters to temp_dir.
+        
+        Args:
+            test_sets: Feature DataFrames for prediction
+            temp_dir: Temporary directory for file I/O
+            batched: If True, group all test sets for a single container
+            
+        Returns:
+            Shard indices processed by each container
+            
+        Raises:
+            RuntimeError: If training data is not available
+        """
         # Save data files
         train_file = os.path.join(temp_dir, "train_data.csv")
-        test_file = os.path.join(temp_dir, "test_data.csv")
         
-        # Save training data with proper handling of empty strings
-        if self.train_data is None:
+        # Save training data serialized during fit
+        if self._train_csv_bytes is None:
             raise RuntimeError("Training data is not available")
         
-        # Replace NaN with empty strings to preserve OpenVA encoding
-        train_data_clean = self.train_data.fillna("")
-        train_data_clean.to_csv(train_file, index=False)
+        with open(train_file, "wb") as f:
+            f.write(self._train_csv_bytes)
         
         # Create test data with empty cause column
-        test_data = X.copy()
-        test_data[self.config.cause_column] = ""
-        # Replace NaN with empty strings to preserve OpenVA encoding
-        test_data_clean = test_data.fillna("")
-        test_data_clean.to_csv(test_file, index=False)
-        
-        # Generate R script
-        r_script = self._generate_r_script()
-        r_script_path = os.path.join(temp_dir, "run_insilico.R")
-        with open(r_script_path, "w") as f:
-            f.write(r_script)
-        
-        # Execute Docker
-        try:
-            probs_df = self._run_docker_command(temp_dir)
-            if probs_df is None and self.config.use_fallback_dockerfile:
-                self.logger.info("Primary Docker image failed, trying fallback Dockerfile")
-                probs_df = self._try_fallback_docker(temp_dir)
-        except Exception as e:
-            self.logger.error(f"Docker execution failed: {str(e)}")
-            raise RuntimeError(f"InSilicoVA Docker execution failed: {str(e)}")
-        
-        if probs_df is None:
-            raise RuntimeError("Failed to get predictions from InSilicoVA")
-        
-        return probs_df
-    
-    def _run_docker_command(self, temp_dir: str) -> Optional[pd.DataFrame]:
-        """Run Docker command for InSilicoVA execution.
+        for index, X in enumerate(test_sets):
+            test_file = os.path.join(temp_dir, f"test_data_{index}.csv")
+            with open(test_file, "wb") as f:
+                f.write(to_csv_bytes(X, self.config.cause_column))
+        
+        # Write parameters for the static R script
+        params_path = os.path.join(temp_dir, "params.dcf")
+        with open(params_path, "w") as f:
+            f.write(self._r_params_dcf)
+        
+        # Group test sets by the container that processes them
+        indices = list(range(len(test_sets)))
+        return [indices] if batched else [[index] for index in indices]
+    
+    def _deduplicate_rows(
+        self, X: pd.DataFrame
+    ) -> tuple[pd.DataFrame, Optional[np.ndarray]]:
+        """Reduce prediction data to unique symptom patterns if configured.
         
         Args:
-            temp_dir: Directory containing input/output files
+            X: Aligned feature DataFrame for prediction
             
         Returns:
-            DataFrame with probabilities or None if failed
+            Tuple of (DataFrame of unique rows, index array mapping each
+            original row to its unique row). The index array is None when
+            deduplication is disabled or there are no duplicates.
         """
-        cmd = [
-            "docker", "run", "--rm",
-            "--platform", self.config.docker_platform,
-            "-v", f"{os.path.abspath(temp_dir)}:/data",
-            self.config.docker_image,
-            "R", "-f", "/data/run_insilico.R"
-        ]
+        if not self.config.deduplicate_rows:
+            return X, None
         
-        self.logger.debug(f"Running Docker command: {' '.join(cmd)}")
+        row_hashes = pd.util.hash_pandas_object(X, index=False).to_numpy()
+        _, unique_idx, inverse = np.unique(
+            row_hashes, return_index=True, return_inverse=True
+        )
+        if len(unique_idx) == len(X):
+            return X, None
         
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=self.config.docker_timeout
-            )
-            
-            if self.config.verbose:
-                if result.stdout:
-                    self.logger.info(f"Docker stdout:\n{result.stdout}")
-                if result.stderr:
-                    self.logger.warning(f"Docker stderr:\n{result.stderr}")
-            
-            if result.returncode != 0:
-                self.logger.error(
-                    f"Docker command failed with return code {result.returncode}"
-                )
-                return None
-            
-            # Read results
-            probs_file = os.path.join(temp_dir, "insilico_probs.csv")
-            if not os.path.exists(probs_file):
-                self.logger.error(f"Output file not found: {probs_file}")
-                return None
-            
-            probs_df = pd.read_csv(probs_file, index_col=0)
-            self.logger.info(
-                f"Successfully loaded predictions: {probs_df.shape}"
-            )
-            
-            return probs_df
-            
-        except subprocess.TimeoutExpired:
-            self.logger.error(
-                f"Docker execution timed out after {self.config.docker_timeout}s"
-            )
-            return None
-        except Exception as e:
-            self.logger.error(f"Docker execution error: {str(e)}")
-            return None
+        self.logger.info(
+            f"Deduplicated {len(X)} prediction rows to {len(unique_idx)} "
+            "unique symptom patterns"
+        )
+        return X.iloc[unique_idx], inverse
     
-    def _try_fallback_docker(self, temp_dir: str) -> Optional[pd.DataFrame]:
-        """Try building and running from local Dockerfile.
+    def _split_into_shards(self, X: pd.DataFrame) -> list[pd.DataFrame]:
+        """Split test data into contiguous shards for concurrent containers.
         
         Args:
-            temp_dir: Directory containing input/output files
+            X: Aligned feature DataFrame for prediction
             
         Returns:
-            DataFrame with probabilities or None if failed
+            List of row-wise shards of X (X itself for a single shard)
         """
-        # Check if Dockerfile exists
-        dockerfile_path = Path("Dockerfile")
-        if not dockerfile_path.exists():
-            self.logger.error("Dockerfile not found for fallback")
-            return None
-        
-        # Build image
-        build_tag = "insilicova-local:latest"
-        build_cmd = ["docker", "build", "-f", "Dockerfile", "-t", build_tag, "."]
-        
-        self.logger.info("Building InSilicoVA image from Dockerfile")
-        try:
-            build_result = subprocess.run(
-                build_cmd,
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minutes for build
-            )
-            
-            if build_result.returncode != 0:
-                self.logger.error(
-                    f"Docker build failed: {build_result.stderr}"
-                )
-                return None
-            
-            # Update config to use local image and retry
-            original_image = self.config.docker_image
-            self.config.docker_image = build_tag
-            
-            result = self._run_docker_command(temp_dir)
-            
-            # Restore original image
-            self.config.docker_image = original_image
-            
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"Fallback Docker build/run failed: {str(e)}")
-            return None
+        n_shards = self._get_num_shards(len(X))
+        if n_shards == 1:
+            return [X]
+        
+        # Positional slices avoid the copy made by fancy indexing
+        bounds = [i * len(X) // n_shards for i in range(n_shards + 1)]
+        return [
+            X.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
     
-    def _generate_r_script(self) -> str:
-        """Generate R script for InSilicoVA execution.
+    def _get_num_shards(self, n_samples: int) -> int:
+        """Determine how many containers to split the test data across.
+        
+        The configured shard count is capped by half the available CPUs and
+        by ``min_shard_size`` so that containers do not oversubscribe the host.
         
+        Args:
+            n_samples: Number of test samples
+            
         Returns:
-            R script as string
+            Number of shards to use (at least 1)
         """
-        params = self.config.get_r_script_params()
-        
-        r_script = f"""
-# InSilicoVA R Script
-library(openVA)
-
-# Set random seed for reproducibility
-set.seed({params['random_seed']})
-
-# Read data
-train_data <- read.csv("/data/train_data.csv", stringsAsFactors = FALSE)
-test_data <- read.csv("/data/test_data.csv", stringsAsFactors = FALSE)
-
-# Add ID columns using row numbers
-train_data <- cbind(ID = seq_len(nrow(train_data)), train_data)
-test_data <- cbind(ID = seq_len(nrow(test_data)), test_data)
-
-# Convert NA to empty strings
-train_data[is.na(train_data)] <- ""
-test_data[is.na(test_data)] <- ""
-
-# Convert all columns to character
-train_data[] <- lapply(train_data, as.character)
-test_data[] <- lapply(test_data, as.character)
-
-# Run InSilicoVA
-tryCatch({{
-    results <- codeVA(
-        data = test_data,
-        data.type = "customize",
-        model = "InSilicoVA",
-        data.train = train_data,
-        causes.train = "{params['cause_column']}",
-        phmrc.type = "{params['phmrc_type']}",
-        jump.scale = {params['jump_scale']},
-        convert.type = "{params['convert_type']}",
-        Nsim = {params['nsim']},
-        auto.length = {params['auto_length']},
-        seed = {params['random_seed']}
-    )
-    
-    # Save individual probabilities
-    if (!is.null(results) && !is.null(results$indiv.prob)) {{
-        write.csv(results$indiv.prob, "/data/insilico_probs.csv")
-        cat("InSilicoVA completed successfully\\n")
-    }} else {{
-        stop("InSilicoVA returned NULL results")
-    }}
-}}, error = function(e) {{
-    cat("Error in InSilicoVA execution:\\n")
-    cat(as.character(e), "\\n")
-    quit(status = 1)
-}})
-"""
-        
-        return r_script
+        max_by_cpu = max(1, (os.cpu_count() or 1) // 2)
+        max_by_size = max(1, n_samples // self.config.min_shard_size)
+        return min(self.config.num_shards, max_by_cpu, max_by_size)
     
     def _format_probabilities(self, probs_df: pd.DataFrame) -> np.ndarray:
         """Format probability DataFrame to numpy array with consistent ordering.
@@ -455,18 +596,17 @@ tryCatch({{
         if self._unique_causes is None:
             raise RuntimeError("Model not fitted - unique causes not available")
         
-        probs_array: np.ndarray = np.zeros((len(probs_df), len(self._unique_causes)))
-        
-        for i, cause in enumerate(self._unique_causes):
-            if cause in probs_df.columns:
-                probs_array[:, i] = probs_df[cause].values
+        probs_array: np.ndarray = probs_df.reindex(
+            columns=self._unique_causes, fill_value=0.0
+        ).to_numpy(dtype=self.config.probability_dtype, copy=False)
         
-        # Normalize if needed (should already sum to 1)
+        # Normalize if needed (should already sum to 1); rows summing to zero
+        # are left as zeros rather than undefined
         row_sums = probs_array.sum(axis=1, keepdims=True)
         probs_array = np.divide(
             probs_array, 
             row_sums, 
-            out=probs_array, 
+            out=np.zeros_like(probs_array), 
             where=row_sums > 0
         )
         
@@ -5,9 +5,11 @@ including Docker settings, model parameters, and execution options.
 """
 
 import logging
-from typing import Literal
+import os
+from functools import lru_cache
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +19,11 @@ class InSilicoVAConfig(BaseModel):
     
     This configuration class manages all settings for the InSilicoVA model,
     including Docker configuration, model hyperparameters, and data processing options.
+    Instances are immutable; use ``model_copy(update=...)`` to derive variants.
     """
     
+    model_config = ConfigDict(frozen=True, validate_default=False)
+    
     # Core InSilicoVA parameters
     nsim: int = Field(
         default=10000, 
@@ -43,6 +48,25 @@ class InSilicoVAConfig(BaseModel):
         default="quantile", 
         description="Prior type: 'quantile' or 'default'"
     )
+    burnin: int = Field(
+        default=2000,
+        ge=0,
+        description="Number of MCMC burn-in iterations discarded by each chain"
+    )
+    thin: int = Field(
+        default=10,
+        ge=1,
+        description="Thinning interval of retained MCMC iterations"
+    )
+    n_chains: int = Field(
+        default=1,
+        ge=1,
+        description=(
+            "Number of MCMC chains run in parallel. Each chain runs the full "
+            "burn-in followed by (nsim - burnin) / n_chains iterations, so the "
+            "chains together retain as many samples as a single chain"
+        )
+    )
     
     # Docker configuration
     docker_image: str = Field(
@@ -63,6 +87,30 @@ class InSilicoVAConfig(BaseModel):
         default=False,
         description="Use local Dockerfile if primary image fails"
     )
+    num_shards: int = Field(
+        default=1,
+        ge=1,
+        description=(
+            "Number of concurrent Docker containers to split test data across. "
+            "InSilicoVA estimates the test population CSMF jointly, so each "
+            "shard is fitted against its own CSMF and probabilities differ "
+            "from an unsharded run"
+        )
+    )
+    min_shard_size: int = Field(
+        default=50,
+        ge=1,
+        description="Minimum number of test samples per shard"
+    )
+    container_mode: Literal["ephemeral", "persistent"] = Field(
+        default="ephemeral",
+        description=(
+            "Run a new container per call or keep one warm container serving "
+            "requests. With n_chains > 1 every request still starts a fresh "
+            "cluster of R workers that each reload openVA, so the warm "
+            "container mainly saves start-up time for single-chain runs"
+        )
+    )
     
     # Data configuration
     cause_column: str = Field(
@@ -78,6 +126,15 @@ class InSilicoVAConfig(BaseModel):
         description="Use Historical Cause-Specific Elements"
     )
     
+    deduplicate_rows: bool = Field(
+        default=False,
+        description=(
+            "Run InSilicoVA once per unique symptom pattern and broadcast the "
+            "probabilities to duplicate rows. Duplicates then no longer weight "
+            "the test population CSMF that InSilicoVA estimates jointly"
+        )
+    )
+    
     # Execution parameters
     random_seed: int = Field(
         default=42, 
@@ -92,6 +149,14 @@ class InSilicoVAConfig(BaseModel):
         default=True,
         description="Enable verbose logging of Docker execution"
     )
+    probability_dtype: Literal["float32", "float64"] = Field(
+        default="float32",
+        description="Floating point precision of predicted probabilities"
+    )
+    tmpfs_dir: Optional[str] = Field(
+        default=None,
+        description="RAM-backed directory for data exchanged with Docker (defaults to /dev/shm when available)"
+    )
     
     @field_validator("docker_platform")
     @classmethod
@@ -173,6 +238,49 @@ class InSilicoVAConfig(BaseModel):
             
         return v
     
+    @model_validator(mode="after")
+    def validate_chain_length(self) -> "InSilicoVAConfig":
+        """Validate that each chain runs longer than its burn-in.
+        
+        Returns:
+            Validated configuration
+            
+        Raises:
+            ValueError: If nsim / n_chains does not exceed burnin
+        """
+        if self.nsim // self.n_chains <= self.burnin:
+            raise ValueError(
+                f"nsim / n_chains ({self.nsim // self.n_chains}) must exceed "
+                f"burnin ({self.burnin}); increase nsim or reduce n_chains"
+            )
+        return self
+    
+    def get_temp_base_dir(self) -> Optional[str]:
+        """Get the parent directory for temporary files shared with Docker.
+        
+        Returns:
+            Configured tmpfs_dir, /dev/shm if available, or None to use the
+            system default temporary directory
+        """
+        if self.tmpfs_dir is not None:
+            return self.tmpfs_dir
+        if os.path.isdir("/dev/shm"):
+            return "/dev/shm"
+        return None
+    
+    def get_docker_resource_args(self) -> list[str]:
+        """Get docker run arguments sizing the container for parallel chains.
+        
+        Each MCMC chain runs single-threaded in its own R worker process, so
+        the container is given one CPU per chain.
+        
+        Returns:
+            CPU limit argument, empty for a single chain
+        """
+        if self.n_chains == 1:
+            return []
+        return [f"--cpus={self.n_chains}"]
+    
     def get_r_script_params(self) -> dict:
         """Get parameters formatted for R script generation.
         
@@ -181,6 +289,12 @@ class InSilicoVAConfig(BaseModel):
         """
         return {
             "nsim": self.nsim,
+            "nsim_per_chain": (
+                self.burnin + (self.nsim - self.burnin) // self.n_chains
+            ),
+            "burnin": self.burnin,
+            "thin": self.thin,
+            "n_chains": self.n_chains,
             "jump_scale": self.jump_scale,
             "auto_length": str(self.auto_length).upper(),
             "convert_type": self.convert_type,
@@ -188,4 +302,21 @@ class InSilicoVAConfig(BaseModel):
             "phmrc_type": self.phmrc_type,
             "random_seed": self.random_seed,
             "use_hce": self.use_hce,
-        }
\ No newline at end of file
+        }
+
+
+@lru_cache(maxsize=128)
+def make_insilico_config(**kwargs: Any) -> InSilicoVAConfig:
+    """Create an InSilicoVA configuration, reusing instances for equal arguments.
+    
+    Configurations are immutable, so repeated requests for the same settings
+    (e.g. across CV folds or hyperparameter sweeps) share one validated
+    instance instead of re-running field validation.
+    
+    Args:
+        **kwargs: InSilicoVAConfig field values (must be hashable)
+        
+    Returns:
+        Validated InSilicoVA configuration
+    """
+    return InSilicoVAConfig(**kwargs)
@@ -4,30 +4,92 @@ This module provides validation utilities for ensuring data compatibility
 and Docker availability for the InSilicoVA model.
 """
 
+import functools
 import logging
 import shutil
 import subprocess
-from typing import Any, Dict, List
+import time
+import weakref
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from baseline.models.model_config import InSilicoVAConfig
 
 logger = logging.getLogger(__name__)
 
+# Seconds a Docker availability probe result is reused
+DOCKER_CHECK_TTL = 30.0
+
 
 class ModelValidationResult(BaseModel):
     """Result of model validation.
     
     Contains validation status, warnings, errors, and metadata
-    about the validation process.
+    about the validation process. Training data validation also keeps
+    the per-cause counts, converted to a dictionary only on access.
     """
     
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
     is_valid: bool
     warnings: List[str] = []
     errors: List[str] = []
     metadata: Dict[str, Any] = {}
+    cause_counts: Optional[pd.Series] = None
+    
+    @property
+    def cause_distribution(self) -> Dict[Any, int]:
+        """Number of training samples per cause."""
+        if self.cause_counts is None:
+            return {}
+        return self.cause_counts.to_dict()
+
+
+@functools.lru_cache(maxsize=32)
+def _check_column_compatibility(
+    train_columns: tuple, test_columns: tuple
+) -> ModelValidationResult:
+    """Compare train and test columns, memoized for repeated column lists.
+    
+    Args:
+        train_columns: Column names from training data
+        test_columns: Column names from test data
+        
+    Returns:
+        ModelValidationResult with column compatibility status
+    """
+    result = ModelValidationResult(is_valid=True)
+    
+    train_set = frozenset(train_columns)
+    test_set = frozenset(test_columns)
+    
+    # Check for missing columns in test data
+    missing_in_test = sorted(train_set.difference(test_set))
+    if missing_in_test:
+        result.is_valid = False
+        result.errors.append(
+            f"Columns missing in test data: {missing_in_test}"
+        )
+    
+    # Check for extra columns in test data
+    extra_in_test = sorted(test_set.difference(train_set))
+    if extra_in_test:
+        result.warnings.append(
+            f"Extra columns in test data will be ignored: {extra_in_test}"
+        )
+    
+    # Store metadata
+    result.metadata.update({
+        "train_columns": len(train_columns),
+        "test_columns": len(test_columns),
+        "missing_in_test": missing_in_test,
+        "extra_in_test": extra_in_test,
+    })
+    
+    return result
 
 
 class InSilicoVAValidator:
@@ -36,8 +98,21 @@ class InSilicoVAValidator:
     This class provides methods to validate Docker availability,
     data format compatibility, and other requirements for running
     the InSilicoVA model.
+    
+    Data validation results are cached per input object (identity, shape,
+    columns and dtypes), so re-validating the same DataFrames across CV folds
+    or bootstrap iterations is a dictionary lookup. Inputs modified in place
+    without changing shape or dtypes are not re-validated.
+    
+    Docker availability is probed at most once per ``DOCKER_CHECK_TTL``
+    seconds for each image and fallback setting, shared across instances.
     """
     
+    # (docker_image, use_fallback_dockerfile) -> (timestamp, result)
+    _docker_cache: ClassVar[
+        Dict[Tuple[str, bool], Tuple[float, ModelValidationResult]]
+    ] = {}
+    
     def __init__(self, config: InSilicoVAConfig):
         """Initialize the validator.
         
@@ -45,7 +120,61 @@ class InSilicoVAValidator:
             config: InSilicoVA model configuration
         """
         self.config = config
-        self.logger = logging.getLogger(__name__)
+        self._cache: Dict[
+            tuple, Tuple[Tuple[weakref.ref, ...], ModelValidationResult]
+        ] = {}
+    
+    @classmethod
+    def clear_docker_cache(cls) -> None:
+        """Discard cached Docker availability results for all images."""
+        cls._docker_cache.clear()
+    
+    @staticmethod
+    def _fingerprint(*data: Union[pd.DataFrame, pd.Series]) -> tuple:
+        """Build a cache key from the identity and schema of pandas objects."""
+        key = []
+        for obj in data:
+            if isinstance(obj, pd.DataFrame):
+                key.append((
+                    id(obj),
+                    obj.shape,
+                    hash(tuple(obj.columns)),
+                    hash(tuple(map(str, obj.dtypes))),
+                ))
+            else:
+                key.append((id(obj), obj.shape, str(obj.dtype)))
+        return tuple(key)
+    
+    def _get_cached(
+        self, kind: str, *data: Union[pd.DataFrame, pd.Series]
+    ) -> Optional[ModelValidationResult]:
+        """Return a cached validation result if the same objects were validated.
+        
+        Weak references guard against a new object reusing the id() of a
+        garbage-collected one.
+        """
+        entry = self._cache.get((kind, self._fingerprint(*data)))
+        if entry is None:
+            return None
+        refs, result = entry
+        if all(ref() is obj for ref, obj in zip(refs, data)):
+            return result
+        return None
+    
+    def _store_cached(
+        self,
+        kind: str,
+        result: ModelValidationResult,
+        *data: Union[pd.DataFrame, pd.Series],
+    ) -> ModelValidationResult:
+        """Cache a validation result, dropping entries for collected objects."""
+        self._cache = {
+            key: entry for key, entry in self._cache.items()
+            if all(ref() is not None for ref in entry[0])
+        }
+        refs = tuple(weakref.ref(obj) for obj in data)
+        self._cache[(kind, self._fingerprint(*data))] = (refs, result)
+        return result
     
     def validate_docker_availability(self) -> ModelValidationResult:
         """Validate that Docker is available and configured properly.
@@ -53,6 +182,17 @@ class InSilicoVAValidator:
         Returns:
             ModelValidationResult with Docker validation status
         """
+        key = (self.config.docker_image, self.config.use_fallback_dockerfile)
+        entry = self._docker_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < DOCKER_CHECK_TTL:
+            return entry[1]
+        
+        result = self._validate_docker_availability()
+        InSilicoVAValidator._docker_cache[key] = (time.monotonic(), result)
+        return result
+    
+    def _validate_docker_availability(self) -> ModelValidationResult:
+        """Run Docker availability checks without caching."""
         result = ModelValidationResult(is_valid=True)
         
         # Check if Docker is installed
@@ -65,13 +205,13 @@ class InSilicoVAValidator:
         try:
             subprocess.run(
                 ["docker", "info"],
-                capture_output=True,
-                text=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 check=True,
                 timeout=10
             )
             result.metadata["docker_available"] = True
-            self.logger.info("Docker is available and running")
+            logger.info("Docker is available and running")
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             result.is_valid = False
             result.errors.append(f"Docker daemon is not running: {str(e)}")
@@ -82,14 +222,14 @@ class InSilicoVAValidator:
         try:
             image_check = subprocess.run(
                 ["docker", "image", "inspect", self.config.docker_image],
-                capture_output=True,
-                text=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=10
             )
             
             if image_check.returncode == 0:
                 result.metadata["image_exists"] = True
-                self.logger.info(f"Docker image {self.config.docker_image} found")
+                logger.info(f"Docker image {self.config.docker_image} found")
             else:
                 result.warnings.append(
                     f"Docker image {self.config.docker_image} not found locally. "
@@ -124,6 +264,19 @@ class InSilicoVAValidator:
         Returns:
             ModelValidationResult with data validation status
         """
+        cached = self._get_cached("training", X, y)
+        if cached is not None:
+            return cached
+        
+        result = self._validate_training_data(X, y)
+        return self._store_cached("training", result, X, y)
+    
+    def _validate_training_data(
+        self, 
+        X: pd.DataFrame, 
+        y: pd.Series
+    ) -> ModelValidationResult:
+        """Run training data validation checks without caching."""
         result = ModelValidationResult(is_valid=True)
         
         # Check for empty data
@@ -149,8 +302,12 @@ class InSilicoVAValidator:
             )
             return result
         
+        # Count causes once; reused for the imbalance checks below
+        cause_counts = y.value_counts(sort=False)
+        counts = cause_counts.to_numpy()
+        
         # Check for minimum unique causes
-        unique_causes = y.nunique()
+        unique_causes = len(counts)
         min_causes = 2
         if unique_causes < min_causes:
             result.is_valid = False
@@ -165,16 +322,26 @@ class InSilicoVAValidator:
             result.errors.append("Target variable contains NA values")
             return result
         
-        # Check for non-string causes
-        if not all(isinstance(val, (str, int)) for val in y.unique()):
+        # Check for non-string causes; integer dtypes are valid without a scan
+        # and object dtypes only need a check of the distinct value types
+        if y.dtype.kind in ("i", "u"):
+            valid_types = True
+        elif y.dtype.kind == "O":
+            valid_types = all(
+                issubclass(val_type, (str, int, np.integer))
+                for val_type in set(map(type, y.unique()))
+            )
+        else:
+            valid_types = False
+        
+        if not valid_types:
             result.warnings.append(
                 "Target contains non-string/int values. Will convert to string."
             )
         
         # Check for very imbalanced data
-        cause_counts = y.value_counts()
-        min_count = cause_counts.min()
-        max_count = cause_counts.max()
+        min_count = int(counts.min())
+        max_count = int(counts.max())
         
         if min_count < 3:
             result.warnings.append(
@@ -193,10 +360,10 @@ class InSilicoVAValidator:
             "n_samples": len(X),
             "n_features": X.shape[1],
             "n_unique_causes": unique_causes,
-            "cause_distribution": cause_counts.to_dict(),
-            "min_cause_count": int(min_count),
-            "max_cause_count": int(max_count),
+            "min_cause_count": min_count,
+            "max_cause_count": max_count,
         })
+        result.cause_counts = cause_counts
         
         return result
     
@@ -209,6 +376,15 @@ class InSilicoVAValidator:
         Returns:
             ModelValidationResult with data validation status
         """
+        cached = self._get_cached("prediction", X)
+        if cached is not None:
+            return cached
+        
+        result = self._validate_prediction_data(X)
+        return self._store_cached("prediction", result, X)
+    
+    def _validate_prediction_data(self, X: pd.DataFrame) -> ModelValidationResult:
+        """Run prediction data validation checks without caching."""
         result = ModelValidationResult(is_valid=True)
         
         # Check for empty data
@@ -247,6 +423,9 @@ class InSilicoVAValidator:
     ) -> ModelValidationResult:
         """Validate that train and test data have compatible columns.
         
+        Results are memoized for the most recent column list pairs and shared
+        across validators.
+        
         Args:
             train_columns: Column names from training data
             test_columns: Column names from test data
@@ -254,32 +433,6 @@ class InSilicoVAValidator:
         Returns:
             ModelValidationResult with column compatibility status
         """
-        result = ModelValidationResult(is_valid=True)
-        
-        train_set = set(train_columns)
-        test_set = set(test_columns)
-        
-        # Check for missing columns in test data
-        missing_in_test = train_set - test_set
-        if missing_in_test:
-            result.is_valid = False
-            result.errors.append(
-                f"Columns missing in test data: {sorted(missing_in_test)}"
-            )
-        
-        # Check for extra columns in test data
-        extra_in_test = test_set - train_set
-        if extra_in_test:
-            result.warnings.append(
-                f"Extra columns in test data will be ignored: {sorted(extra_in_test)}"
-            )
-        
-        # Store metadata
-        result.metadata.update({
-            "train_columns": len(train_columns),
-            "test_columns": len(test_columns),
-            "missing_in_test": sorted(missing_in_test) if missing_in_test else [],
-            "extra_in_test": sorted(extra_in_test) if extra_in_test else [],
-        })
-        
-        return result
\ No newline at end of file
+        return _check_column_compatibility(
+            tuple(train_columns), tuple(test_columns)
+        )
\ No newline at end of file
@@ -1,6 +1,7 @@
 """TabICL (Tabular In-Context Learning) model implementation for VA classification."""
 
 import warnings
+from functools import cached_property
 from typing import Any, Dict, Optional, Union
 
 import numpy as np
@@ -36,7 +37,9 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
         self.config = config or TabICLConfig()
         self._tabicl_model = None
         self._label_encoder = LabelEncoder()
+        self._classes = None
         self._feature_names = None
+        self._feature_names_index = None
         self._n_features = None
         self._n_classes = None
         
@@ -48,8 +51,9 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
                 UserWarning
                 )
     
-    def _get_device(self) -> str:
-        """Determine the best device to use."""
+    @cached_property
+    def _device(self) -> str:
+        """Determine the best device to use, probed once per instance."""
         if self.config.device != "auto":
             return self.config.device
         
@@ -64,6 +68,36 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
         except ImportError:
             return "cpu"
     
+    def _encode_labels(self, y: pd.Series) -> np.ndarray:
+        """Encode labels, skipping the LabelEncoder for dense integer codes.
+        
+        Integer labels that already cover every value in [0, n_classes) are
+        used as-is; anything else goes through a LabelEncoder.
+        """
+        if y.dtype.kind in "iu" and len(y) > 0:
+            y_array = y.to_numpy()
+            if 0 <= y_array.min() and y_array.max() < len(y_array):
+                if np.bincount(y_array).all():
+                    self._label_encoder = None
+                    self._classes = np.arange(int(y_array.max()) + 1)
+                    return y_array
+        
+        self._label_encoder = LabelEncoder()
+        y_encoded = self._label_encoder.fit_transform(y)
+        self._classes = self._label_encoder.classes_
+        return y_encoded
+    
+    @staticmethod
+    def _to_array(X: pd.DataFrame) -> np.ndarray:
+        """Convert features to an array, as float32 when all columns are numeric.
+        
+        Numeric features are not copied if already float32. Frames with
+        object or categorical columns are passed to TabICL unconverted.
+        """
+        if all(pd.api.types.is_numeric_dtype(dtype) for dtype in X.dtypes):
+            return X.to_numpy(dtype=np.float32, copy=False)
+        return X.to_numpy()
+    
     def _check_tabicl_available(self):
         """Check if TabICL is available."""
         if not self._tabicl_available:
@@ -86,11 +120,12 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
         
         # Store feature information
         self._feature_names = list(X.columns)
+        self._feature_names_index = X.columns.copy()
         self._n_features = len(self._feature_names)
         
         # Encode labels
-        y_encoded = self._label_encoder.fit_transform(y)
-        self._n_classes = len(self._label_encoder.classes_)
+        y_encoded = self._encode_labels(y)
+        self._n_classes = len(self._classes)
         
         # Validate VA constraints
         if self._n_classes > self.config.max_classes_warning:
@@ -109,7 +144,7 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
         
         # Initialize TabICL directly
         if TABICL_AVAILABLE:
-            device = self._get_device()
+            device = self._device
             self._tabicl_model = TabICLClassifier(
                 n_estimators=self.config.n_estimators,
                 norm_methods=self.config.norm_methods,
@@ -127,8 +162,9 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
             )
             
             # Fit the model with memory fallback
+            X_array = self._to_array(X)
             try:
-                self._tabicl_model.fit(X.values, y_encoded)
+                self._tabicl_model.fit(X_array, y_encoded)
             except Exception as e:
                 if "out of memory" in str(e).lower():
                     warnings.warn(
@@ -136,7 +172,7 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
                         UserWarning
                     )
                     self._tabicl_model.device = "cpu"
-                    self._tabicl_model.fit(X.values, y_encoded)
+                    self._tabicl_model.fit(X_array, y_encoded)
                 else:
                     raise
         
@@ -155,23 +191,26 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
         self._check_tabicl_available()
         
         # Validate features
-        if list(X.columns) != self._feature_names:
+        if not X.columns.equals(self._feature_names_index):
             raise ValueError(
                 f"Feature mismatch. Expected {self._feature_names}, "
                 f"got {list(X.columns)}"
             )
         
         # Get predictions with error handling
+        X_array = self._to_array(X)
         try:
-            y_pred_encoded = self._tabicl_model.predict(X.values)
+            y_pred_encoded = self._tabicl_model.predict(X_array)
         except Exception as e:
             if "out of memory" in str(e).lower():
                 # Try batch prediction
-                y_pred_encoded = self._predict_in_batches(X.values)
+                y_pred_encoded = self._predict_in_batches(X_array)
             else:
                 raise
         
         # Decode labels
+        if self._label_encoder is None:
+            return y_pred_encoded
         return self._label_encoder.inverse_transform(y_pred_encoded)
     
     def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
@@ -187,49 +226,79 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
         self._check_tabicl_available()
         
         # Validate features
-        if list(X.columns) != self._feature_names:
+        if not X.columns.equals(self._feature_names_index):
             raise ValueError(
                 f"Feature mismatch. Expected {self._feature_names}, "
                 f"got {list(X.columns)}"
             )
         
         # Get probabilities with error handling
+        X_array = self._to_array(X)
         try:
-            proba = self._tabicl_model.predict_proba(X.values)
+            proba = self._tabicl_model.predict_proba(X_array)
         except Exception as e:
             if "out of memory" in str(e).lower():
                 # Try batch prediction
-                proba = self._predict_proba_in_batches(X.values)
+                proba = self._predict_proba_in_batches(X_array)
             else:
                 raise
         
         return proba
     
+    def _get_batch_size(self, n_samples: int) -> int:
+        """Choose a prediction batch size after a full-batch OOM.
+        
+        The batch never exceeds a tenth of the input, since the full batch
+        already ran out of memory. On CUDA it is reduced further to fit in
+        about 80% of the free memory (after releasing cached blocks),
+        assuming 4-byte values and a safety factor of 4. This estimate
+        ignores TabICL's training-context memory, hence the upper bound.
+        """
+        batch_size = max(1, n_samples // 10)
+        if self._device == "cuda":
+            try:
+                import torch
+                torch.cuda.empty_cache()
+                free_bytes, _ = torch.cuda.mem_get_info()
+                bytes_per_sample = self._n_features * max(1, self._n_classes) * 4 * 4
+                batch_size = max(
+                    1, min(batch_size, int(free_bytes * 0.8 // bytes_per_sample))
+                )
+            except (ImportError, RuntimeError):
+                pass
+        return batch_size
+    
     def _predict_in_batches(self, X: np.ndarray) -> np.ndarray:
         """Predict in smaller batches to avoid memory issues."""
         n_samples = X.shape[0]
-        batch_size = max(1, n_samples // 10)  # Use 10 batches
-        predictions = []
+        batch_size = self._get_batch_size(n_samples)
         
-        for i in range(0, n_samples, batch_size):
+        # First batch determines the output dtype
+        first = self._tabicl_model.predict(X[:batch_size])
+        predictions = np.empty(n_samples, dtype=first.dtype)
+        predictions[:batch_size] = first
+        
+        for i in range(batch_size, n_samples, batch_size):
             batch = X[i:i + batch_size]
-            pred = self._tabicl_model.predict(batch)
-            predictions.append(pred)
+            predictions[i:i + batch_size] = self._tabicl_model.predict(batch)
         
-        return np.concatenate(predictions)
+        return predictions
     
     def _predict_proba_in_batches(self, X: np.ndarray) -> np.ndarray:
         """Predict probabilities in smaller batches."""
         n_samples = X.shape[0]
-        batch_size = max(1, n_samples // 10)
-        probabilities = []
+        batch_size = self._get_batch_size(n_samples)
+        
+        # First batch determines the output dtype and number of columns
+        first = self._tabicl_model.predict_proba(X[:batch_size])
+        probabilities = np.empty((n_samples, first.shape[1]), dtype=first.dtype)
+        probabilities[:batch_size] = first
         
-        for i in range(0, n_samples, batch_size):
+        for i in range(batch_size, n_samples, batch_size):
             batch = X[i:i + batch_size]
-            proba = self._tabicl_model.predict_proba(batch)
-            probabilities.append(proba)
+            probabilities[i:i + batch_size] = self._tabicl_model.predict_proba(batch)
         
-        return np.vstack(probabilities)
+        return probabilities
     
     def get_params(self, deep: bool = True) -> Dict[str, Any]:
         """Get parameters for this estimator.
@@ -268,16 +337,36 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
         
         # Update config if needed
         if config_params:
+            config_cls = type(self.config) if self.config is not None else TabICLConfig
+            unknown = set(config_params) - set(config_cls.model_fields)
+            if unknown:
+                raise ValueError(
+                    f"Invalid config parameters for {config_cls.__name__}: "
+                    f"{sorted(unknown)}"
+                )
+            
             if self.config is None:
                 self.config = TabICLConfig(**config_params)
             else:
-                for key, value in config_params.items():
-                    setattr(self.config, key, value)
+                # Only rebuild the config when a value actually changes; one
+                # model_validate pass validates all changed fields together
+                changed = {
+                    key: value for key, value in config_params.items()
+                    if getattr(self.config, key) != value
+                }
+                if changed:
+                    self.config = config_cls.model_validate(
+                        {**self.config.model_dump(), **changed}
+                    )
         
         # Handle other parameters
         for key, value in other_params.items():
             setattr(self, key, value)
         
+        # Re-resolve the device if the config may have changed
+        if config_params or "config" in other_params:
+            self.__dict__.pop("_device", None)
+        
         return self
     
     def calculate_csmf_accuracy(
@@ -298,19 +387,11 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
         true_counts = y_true.value_counts(normalize=True)
         pred_counts = pd.Series(y_pred).value_counts(normalize=True)
         
-        # Align the indices
-        all_causes = set(true_counts.index) | set(pred_counts.index)
-        true_csmf = pd.Series(
-            [true_counts.get(cause, 0) for cause in all_causes],
-            index=list(all_causes)
-        )
-        pred_csmf = pd.Series(
-            [pred_counts.get(cause, 0) for cause in all_causes],
-            index=list(all_causes)
-        )
+        # Align the indices (outer join, missing causes get 0)
+        true_csmf, pred_csmf = true_counts.align(pred_counts, fill_value=0.0)
         
         # Calculate CSMF accuracy
-        min_csmf = np.minimum(true_csmf.values, pred_csmf.values).sum()
+        min_csmf = np.minimum(true_csmf.to_numpy(), pred_csmf.to_numpy()).sum()
         csmf_accuracy = 2 * (min_csmf - 0.5)
         
         return max(0, min(1, csmf_accuracy))
@@ -318,8 +399,8 @@ class TabICLModel(BaseEstimator, ClassifierMixin):
     @property
     def classes_(self) -> np.ndarray:
         """Get the class labels."""
-        check_is_fitted(self, "_label_encoder")
-        return self._label_encoder.classes_
+        check_is_fitted(self, "_tabicl_model")
+        return self._classes
     
     @property
     def is_using_fallback(self) -> bool:
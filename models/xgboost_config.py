@@ -1,8 +1,8 @@
 """Configuration for XGBoost model using Pydantic."""
 
-from typing import Dict, Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class XGBoostConfig(BaseModel):
@@ -31,13 +31,15 @@ class XGBoostConfig(BaseModel):
     )
 
     # Class imbalance handling
-    scale_pos_weight: Optional[Dict[int, float]] = Field(
-        default=None, description="Class weights"
+    scale_pos_weight: Optional[List[float]] = Field(
+        default=None, description="Per-class weights, indexed by encoded class"
     )
 
     # Performance
     tree_method: str = Field(default="hist", description="Tree construction algorithm")
-    device: str = Field(default="cpu", description="Device to use (cpu/cuda)")
+    device: str = Field(
+        default="auto", description="Device to use (auto/cpu/cuda)"
+    )
     n_jobs: int = Field(default=-1, description="Number of parallel threads")
 
     # Regularization
@@ -48,6 +50,17 @@ class XGBoostConfig(BaseModel):
     missing: float = Field(
         default=float("nan"), description="Value to treat as missing"
     )
+    sparse_threshold: Optional[float] = Field(
+        default=None,
+        ge=0,
+        le=1,
+        description=(
+            "Opt-in: fraction of zeros above which features are passed to "
+            "XGBoost as a CSR matrix. When enabled, zeros AND NaN are both "
+            "treated as missing, which changes what the model learns when 0 "
+            "and missing differ (None disables)"
+        ),
+    )
 
     # Early stopping
     early_stopping_rounds: Optional[int] = Field(
@@ -65,8 +78,10 @@ class XGBoostConfig(BaseModel):
     @field_validator("device")
     def validate_device(cls, v: str) -> str:
         """Validate device parameter."""
-        if not v.startswith(("cpu", "cuda", "gpu")):
-            raise ValueError("device must be 'cpu' or start with 'cuda' or 'gpu'")
+        if v != "auto" and not v.startswith(("cpu", "cuda", "gpu")):
+            raise ValueError(
+                "device must be 'auto', 'cpu' or start with 'cuda' or 'gpu'"
+            )
         return v
 
     @field_validator("objective")
@@ -79,4 +94,18 @@ class XGBoostConfig(BaseModel):
             )
         return v
 
+    @model_validator(mode="after")
+    def validate_scale_pos_weight(self) -> "XGBoostConfig":
+        """Validate that class weights match the number of classes."""
+        if (
+            self.scale_pos_weight is not None
+            and self.num_class is not None
+            and len(self.scale_pos_weight) != self.num_class
+        ):
+            raise ValueError(
+                f"scale_pos_weight has {len(self.scale_pos_weight)} entries, "
+                f"expected num_class={self.num_class}"
+            )
+        return self
+
     model_config = {"validate_assignment": True, "extra": "forbid"}
@@ -93,7 +93,7 @@ class XGBoostEnhancedConfig(XGBoostConfig):
         Returns:
             Dictionary of XGBoost parameters
         """
-        params = super().to_dict()
+        params = self.model_dump()
         
         # Add enhanced parameters
         params.update(self._enhanced_params)
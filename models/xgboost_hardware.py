@@ -0,0 +1,91 @@
+"""Hardware detection helpers for the XGBoost model.
+
+This module resolves the compute device and thread count XGBoost should use
+when the configuration leaves them to auto-detection.
+"""
+
+import ctypes
+import logging
+import os
+from functools import lru_cache
+
+import xgboost as xgb
+
+# Try to import psutil for physical core counts
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# XGBoost histogram building stops scaling beyond this many threads
+MAX_AUTO_THREADS = 16
+
+
+@lru_cache(maxsize=1)
+def cuda_available() -> bool:
+    """Check whether XGBoost can train on a CUDA GPU.
+
+    Requires an XGBoost build with CUDA support and at least one visible
+    CUDA device. The result is computed once per process.
+
+    Returns:
+        True if a CUDA GPU is usable by XGBoost
+    """
+    if not xgb.build_info().get("USE_CUDA", False):
+        return False
+
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        pass
+
+    # Query the CUDA driver directly when torch is not installed
+    try:
+        libcuda = ctypes.CDLL("libcuda.so.1")
+    except OSError:
+        return False
+    count = ctypes.c_int()
+    if libcuda.cuInit(0) != 0:
+        return False
+    if libcuda.cuDeviceGetCount(ctypes.byref(count)) != 0:
+        return False
+    return count.value > 0
+
+
+def resolve_device(device: str) -> str:
+    """Resolve an ``"auto"`` device setting to ``"cuda"`` or ``"cpu"``.
+
+    Args:
+        device: Configured device
+
+    Returns:
+        The configured device, or the detected one for ``"auto"``
+    """
+    if device != "auto":
+        return device
+    resolved = "cuda" if cuda_available() else "cpu"
+    logger.debug(f"Auto-detected XGBoost device: {resolved}")
+    return resolved
+
+
+@lru_cache(maxsize=1)
+def default_nthread() -> int:
+    """Choose the XGBoost thread count used when ``n_jobs`` is not positive.
+
+    Uses the number of physical cores when psutil can report it, so SMT
+    siblings are not counted twice, capped at ``MAX_AUTO_THREADS``. The
+    result is computed and logged once per process.
+
+    Returns:
+        Number of threads to pass as ``nthread``
+    """
+    n_threads = os.cpu_count() or 1
+    if PSUTIL_AVAILABLE:
+        n_threads = psutil.cpu_count(logical=False) or n_threads
+    n_threads = max(1, min(n_threads, MAX_AUTO_THREADS))
+    logger.info(f"Using {n_threads} XGBoost threads")
+    return n_threads
@@ -1,17 +1,21 @@
 """XGBoost model implementation for VA cause-of-death prediction."""
 
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 import xgboost as xgb
+from joblib import Parallel, delayed
 from sklearn.base import BaseEstimator, ClassifierMixin
 from sklearn.model_selection import KFold, StratifiedKFold
 from sklearn.preprocessing import LabelEncoder
-from sklearn.utils.class_weight import compute_sample_weight
 
+from baseline.models.csmf_kernel import csmf_accuracy_from_codes
 from baseline.models.xgboost_config import XGBoostConfig
+from baseline.models.xgboost_hardware import default_nthread, resolve_device
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +31,7 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
         config: XGBoostConfig object containing model parameters
         model_: Trained XGBoost Booster object (after fitting)
         label_encoder_: LabelEncoder for encoding/decoding cause labels
+            (built lazily from classes_)
         feature_names_: List of feature names from training data
         classes_: Array of unique class labels
         _is_fitted: Boolean indicating if model has been trained
@@ -40,11 +45,42 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
         """
         self.config = config or XGBoostConfig()
         self.model_: Optional[xgb.Booster] = None
-        self.label_encoder_: Optional[LabelEncoder] = None
+        self._label_encoder: Optional[LabelEncoder] = None
         self.feature_names_: Optional[List[str]] = None
+        self._feature_names_tuple_: Optional[Tuple[str, ...]] = None
+        self._validated_columns_: Optional[pd.Index] = None
         self.classes_: Optional[np.ndarray] = None
+        self._class_index_: Optional[pd.Index] = None
+        self._sparse_input_ = False
+        self._predict_postprocess = self._ensure_2d
         self._is_fitted = False
+        self._clear_eval_cache()
+
+    def _clear_eval_cache(self) -> None:
+        """Drop the cached eval-set DMatrix reused by predict_proba."""
+        self._cached_deval_ref: Optional[weakref.ref] = None
+        self._cached_deval: Optional[xgb.DMatrix] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Exclude the unpicklable eval DMatrix cache from pickling."""
+        state = dict(super().__getstate__())
+        state["_cached_deval_ref"] = None
+        state["_cached_deval"] = None
+        return state
         
+    @property
+    def label_encoder_(self) -> Optional[LabelEncoder]:
+        """LabelEncoder matching ``classes_``, built on first access."""
+        if self._label_encoder is None and self.classes_ is not None:
+            encoder = LabelEncoder()
+            encoder.classes_ = self.classes_
+            self._label_encoder = encoder
+        return self._label_encoder
+
+    @label_encoder_.setter
+    def label_encoder_(self, value: Optional[LabelEncoder]) -> None:
+        self._label_encoder = value
+
     def get_params(self, deep: bool = True) -> Dict[str, Any]:
         """Get parameters for this estimator.
 
@@ -72,6 +108,8 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
         Returns:
             Self: Estimator instance.
         """
+        self._clear_eval_cache()
+
         if "config" in params:
             self.config = params.pop("config")
             
@@ -126,66 +164,125 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
 
         # Store feature names
         self.feature_names_ = X.columns.tolist()
+        self._feature_names_tuple_ = tuple(self.feature_names_)
+        self._validated_columns_ = None
 
-        # Encode labels
-        self.label_encoder_ = LabelEncoder()
-        y_encoded = self.label_encoder_.fit_transform(y)
-        self.classes_ = self.label_encoder_.classes_
+        # Encode labels; the LabelEncoder itself is only built if accessed
+        y_encoded, self.classes_ = self._factorize_labels(y)
+        self._label_encoder = None
+        self._class_index_ = pd.Index(self.classes_)
 
         # Update num_class if not set
         if self.config.num_class is None:
             self.config.num_class = len(self.classes_)
 
         # Handle class imbalance with sample weights if not provided
-        if sample_weight is None and len(np.unique(y_encoded)) > 1:
-            sample_weight = compute_sample_weight("balanced", y_encoded)
-            logger.info("Using balanced sample weights for class imbalance")
-
-        # Create DMatrix with missing value handling
-        dtrain = xgb.DMatrix(
-            X.values,
-            label=y_encoded,
-            feature_names=self.feature_names_,
-            weight=sample_weight,
-            missing=self.config.missing,
-        )
+        if sample_weight is None:
+            sample_weight = self._default_sample_weight(y_encoded)
 
         # Prepare parameters
         params = self._get_xgb_params()
 
-        # Prepare eval list if provided
-        evals = []
+        # With hist, QuantileDMatrix bins the data once up front instead of
+        # keeping the raw values for XGBoost to sketch
+        use_quantile = params.get("tree_method") == "hist"
+
+        # Choose dense or CSR input once; prediction must use the same one
+        data = self._to_float32(X)
+        self._sparse_input_ = self._is_sparse(data)
+        if self._sparse_input_:
+            data = self._to_csr(data)
+            logger.info("Using sparse CSR input for mostly-zero features")
+
+        # Create DMatrix with missing value handling
+        dtrain = self._make_train_dmatrix(
+            data, y_encoded, weight=sample_weight, quantile=use_quantile
+        )
+
+        # Prepare eval list if provided; the last eval DMatrix is kept so that
+        # predicting on the same frame (as in validation) skips rebuilding it
+        self._clear_eval_cache()
+        evals: Optional[List[Tuple[xgb.DMatrix, str]]] = None
         if eval_set is not None:
+            evals = []
             for i, (X_eval, y_eval) in enumerate(eval_set):
-                y_eval_encoded = self.label_encoder_.transform(y_eval)
-                deval = xgb.DMatrix(
-                    X_eval.values,
-                    label=y_eval_encoded,
-                    feature_names=self.feature_names_,
-                    missing=self.config.missing,
+                # predict_proba reuses the cached DMatrix without checking
+                # columns, so reject mismatched eval frames here
+                self._check_feature_names(X_eval)
+                y_eval_encoded = self._encode_labels(y_eval)
+                deval = self._make_train_dmatrix(
+                    self._prepare_data(X_eval),
+                    y_eval_encoded,
+                    quantile=use_quantile,
+                    ref=dtrain,
                 )
                 evals.append((deval, f"eval_{i}"))
-        else:
-            evals = [(dtrain, "train")]
+                self._cached_deval_ref = weakref.ref(X_eval)
+                self._cached_deval = deval
+
+        return self.fit_from_dmatrix(dtrain, evals)
+
+    def fit_from_dmatrix(
+        self,
+        dtrain: xgb.DMatrix,
+        evals: Optional[List[Tuple[xgb.DMatrix, str]]] = None,
+    ) -> "XGBoostModel":
+        """Train the booster on prepared DMatrix objects.
+
+        Shared by ``fit`` and ``cross_validate``. Labels and weights must
+        already be set on ``dtrain``, and ``config.num_class`` must be known.
+
+        Without ``evals`` no per-round evaluation is run; the metric is
+        never reported, so this does not change the trained model, its
+        number of rounds or its feature importances.
+
+        Args:
+            dtrain: Training DMatrix with encoded labels
+            evals: Optional (DMatrix, name) pairs evaluated during training
+
+        Returns:
+            Self: Fitted model instance
+        """
+        params = self._get_xgb_params()
 
         # Train model
-        callbacks = []
-        if self.config.early_stopping_rounds and len(evals) > 1:
-            callbacks.append(
-                xgb.callback.EarlyStopping(
-                    rounds=self.config.early_stopping_rounds,
-                    save_best=True,
-                )
+        early_stopping_rounds = None
+        if self.config.early_stopping_rounds and evals and len(evals) > 1:
+            early_stopping_rounds = self.config.early_stopping_rounds
+
+        try:
+            self.model_ = xgb.train(
+                params=params,
+                dtrain=dtrain,
+                num_boost_round=self.config.n_estimators,
+                evals=evals,
+                early_stopping_rounds=early_stopping_rounds,
+                verbose_eval=False,
+            )
+        except xgb.core.XGBoostError as e:
+            if self.config.device != "auto" or params.get("device") == "cpu":
+                raise
+            # Auto-selected GPU failed; retry on CPU with the same matrices
+            logger.warning(f"GPU training failed, falling back to CPU: {str(e)}")
+            params.update({"device": "cpu", "tree_method": "hist"})
+            self.model_ = xgb.train(
+                params=params,
+                dtrain=dtrain,
+                num_boost_round=self.config.n_estimators,
+                evals=evals,
+                early_stopping_rounds=early_stopping_rounds,
+                verbose_eval=False,
             )
 
-        self.model_ = xgb.train(
-            params=params,
-            dtrain=dtrain,
-            num_boost_round=self.config.n_estimators,
-            evals=evals,
-            callbacks=callbacks,
-            verbose_eval=False,
-        )
+        # Keep only the rounds up to the best iteration (save_best semantics)
+        if early_stopping_rounds and self.model_.attr("best_iteration") is not None:
+            self.model_ = self.model_[: self.model_.best_iteration + 1]
+
+        # multi:softprob always returns a 2D array, so it needs no reshape check
+        if self.config.objective == "multi:softprob":
+            self._predict_postprocess = self._identity
+        else:
+            self._predict_postprocess = self._ensure_2d
 
         self._is_fitted = True
         logger.info(
@@ -203,14 +300,29 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
         Returns:
             Array of predicted cause labels (decoded from numeric)
 
+        Raises:
+            ValueError: If model is not fitted
+            TypeError: If X is not a DataFrame
+        """
+        return self.classes_[self.predict_encoded(X)]
+
+    def predict_encoded(self, X: pd.DataFrame) -> np.ndarray:
+        """Predict encoded cause indices into ``classes_``.
+
+        Args:
+            X: Features as pandas DataFrame
+
+        Returns:
+            Array of predicted class indices
+
         Raises:
             ValueError: If model is not fitted
             TypeError: If X is not a DataFrame
         """
         self._check_is_fitted()
-        proba = self.predict_proba(X)
-        class_indices = np.argmax(proba, axis=1)
-        return self.label_encoder_.inverse_transform(class_indices)
+        # Softmax is monotone, so the argmax of the margins is the argmax
+        # of the probabilities without the exp/normalize pass
+        return np.argmax(self._predict_logits(X), axis=1)
 
     def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
         """Predict probability distribution over causes.
@@ -227,31 +339,227 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
         """
         self._check_is_fitted()
 
+        # Get predictions, reusing the eval DMatrix if X is the eval frame
+        ref = self._cached_deval_ref
+        if ref is not None and ref() is X:
+            dtest = self._cached_deval
+        else:
+            dtest = self._make_dmatrix(X)
+        return self._predict_postprocess(self.model_.predict(dtest))
+
+    @staticmethod
+    def _identity(proba: np.ndarray) -> np.ndarray:
+        """Return predictions unchanged (multi:softprob output is 2D)."""
+        return proba
+
+    def _ensure_2d(self, proba: np.ndarray) -> np.ndarray:
+        """Reshape flat predictions to (n_samples, n_classes)."""
+        if proba.ndim == 1:
+            proba = proba.reshape(-1, self.config.num_class)
+        return proba
+
+    def _predict_logits(self, X: pd.DataFrame) -> np.ndarray:
+        """Predict raw (untransformed) class margins.
+
+        Args:
+            X: Features as pandas DataFrame
+
+        Returns:
+            2D array of shape (n_samples, n_classes) with raw margins
+        """
+        margins = self.model_.predict(self._make_dmatrix(X), output_margin=True)
+        if margins.ndim == 1:
+            margins = margins.reshape(-1, self.config.num_class)
+        return margins
+
+    def _check_feature_names(self, X: pd.DataFrame) -> None:
+        """Check that the columns of X match the training features.
+
+        Args:
+            X: Features as pandas DataFrame
+
+        Raises:
+            TypeError: If X is not a DataFrame
+            ValueError: If the columns do not match the training features
+        """
         if not isinstance(X, pd.DataFrame):
             raise TypeError("X must be a pandas DataFrame")
 
-        # Ensure columns match training features
-        if list(X.columns) != self.feature_names_:
-            raise ValueError(
-                f"Feature names mismatch. Expected {self.feature_names_}, "
-                f"got {list(X.columns)}"
-            )
+        # Index objects are immutable, so a column index that already passed
+        # needs no second comparison
+        if X.columns is not self._validated_columns_:
+            if tuple(X.columns) != self._feature_names_tuple_:
+                raise ValueError(
+                    f"Feature names mismatch. Expected {self.feature_names_}, "
+                    f"got {list(X.columns)}"
+                )
+            self._validated_columns_ = X.columns
+
+    def _make_dmatrix(self, X: pd.DataFrame) -> xgb.DMatrix:
+        """Validate prediction features and wrap them in a DMatrix.
+
+        Args:
+            X: Features as pandas DataFrame
+
+        Returns:
+            Unlabelled DMatrix for prediction
+
+        Raises:
+            TypeError: If X is not a DataFrame
+            ValueError: If the columns do not match the training features
+        """
+        self._check_feature_names(X)
 
-        # Create DMatrix
-        dtest = xgb.DMatrix(
-            X.values,
+        return xgb.DMatrix(
+            self._prepare_data(X),
             feature_names=self.feature_names_,
             missing=self.config.missing,
         )
 
-        # Get predictions
-        proba = self.model_.predict(dtest)
+    @staticmethod
+    def _factorize_labels(y: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode training labels against their sorted unique values.
 
-        # Ensure 2D array
-        if proba.ndim == 1:
-            proba = proba.reshape(-1, self.config.num_class)
+        Uses a hash-based categorical, which sorts categories like
+        LabelEncoder without its sort-based encoding pass.
 
-        return proba
+        Args:
+            y: Training labels
+
+        Returns:
+            Tuple of (int32 class indices, sorted class labels)
+
+        Raises:
+            ValueError: If y contains missing labels
+        """
+        labels = pd.Categorical(y)
+        codes = labels.codes
+        if (codes < 0).any():
+            raise ValueError(
+                f"y contains {int((codes < 0).sum())} missing labels"
+            )
+        return codes.astype(np.int32), np.asarray(labels.categories)
+
+    def _encode_labels(self, y: pd.Series) -> np.ndarray:
+        """Encode labels with a hash lookup into the fitted classes.
+
+        Args:
+            y: Labels to encode
+
+        Returns:
+            Integer class indices
+
+        Raises:
+            ValueError: If y contains labels not seen during fit
+        """
+        codes = self._class_index_.get_indexer(y)
+        if (codes < 0).any():
+            unseen = pd.unique(np.asarray(y)[codes < 0])
+            raise ValueError(f"y contains previously unseen labels: {list(unseen)}")
+        return codes
+
+    @staticmethod
+    def _to_float32(X: pd.DataFrame) -> np.ndarray:
+        """Convert features to a C-contiguous float32 array.
+
+        Avoids the float64 (or object) copy of ``X.values``; NaN stays NaN,
+        so the default ``missing=nan`` handling is unchanged.
+        """
+        return np.ascontiguousarray(X.to_numpy(dtype=np.float32, copy=False))
+
+    def _is_sparse(self, data: np.ndarray) -> bool:
+        """Check whether features are zero-heavy enough for CSR input.
+
+        Disabled unless ``config.sparse_threshold`` is set, since CSR input
+        makes XGBoost treat zeros (and NaN) as missing. The zero fraction is
+        estimated on a strided sample of about 1000 rows.
+
+        Args:
+            data: Dense feature array
+
+        Returns:
+            True if the zero fraction exceeds ``config.sparse_threshold``
+        """
+        threshold = self.config.sparse_threshold
+        if threshold is None or data.size == 0:
+            return False
+        sample = data[:: max(1, len(data) // 1000)]
+        return 1 - np.count_nonzero(sample) / sample.size > threshold
+
+    @staticmethod
+    def _to_csr(data: np.ndarray) -> sp.csr_matrix:
+        """Convert dense features to CSR, storing NaN like zeros.
+
+        Entries left out of a CSR matrix are missing to XGBoost, so both
+        zeros and NaN follow each split's learned default direction.
+        """
+        return sp.csr_matrix(np.where(np.isnan(data), 0, data))
+
+    def _prepare_data(self, X: pd.DataFrame) -> Union[np.ndarray, sp.csr_matrix]:
+        """Convert features to the dense or CSR layout chosen at fit time."""
+        data = self._to_float32(X)
+        return self._to_csr(data) if self._sparse_input_ else data
+
+    def _default_sample_weight(self, y_encoded: np.ndarray) -> Optional[np.ndarray]:
+        """Build sample weights from configured or balanced class weights.
+
+        Args:
+            y_encoded: Encoded training labels
+
+        Returns:
+            Per-sample weights, or None for a single-class target
+        """
+        if self.config.scale_pos_weight is not None:
+            class_weights = np.asarray(self.config.scale_pos_weight, dtype=np.float32)
+            logger.info("Using configured per-class weights")
+            return class_weights[y_encoded]
+        # Balanced weights n / (n_classes * count), as sklearn's "balanced";
+        # classes absent from y_encoded get no weight and are never gathered
+        counts = np.bincount(y_encoded)
+        n_present = np.count_nonzero(counts)
+        if n_present > 1:
+            logger.info("Using balanced sample weights for class imbalance")
+            with np.errstate(divide="ignore"):
+                class_weights = len(y_encoded) / (n_present * counts)
+            return class_weights.astype(np.float32)[y_encoded]
+        return None
+
+    def _make_train_dmatrix(
+        self,
+        data: np.ndarray,
+        label: np.ndarray,
+        weight: Optional[np.ndarray] = None,
+        quantile: bool = False,
+        ref: Optional[xgb.DMatrix] = None,
+    ) -> xgb.DMatrix:
+        """Create a labelled DMatrix for training or evaluation.
+
+        Args:
+            data: Feature array
+            label: Encoded labels
+            weight: Optional sample weights
+            quantile: Build a QuantileDMatrix (for the hist tree method)
+            ref: Training QuantileDMatrix whose bins evaluation data reuses
+
+        Returns:
+            DMatrix, or QuantileDMatrix if ``quantile`` is set
+        """
+        if quantile:
+            return xgb.QuantileDMatrix(
+                data,
+                label=label,
+                weight=weight,
+                feature_names=self.feature_names_,
+                missing=self.config.missing,
+                ref=ref,
+            )
+        return xgb.DMatrix(
+            data,
+            label=label,
+            weight=weight,
+            feature_names=self.feature_names_,
+            missing=self.config.missing,
+        )
 
     def get_feature_importance(self, importance_type: str = "gain") -> pd.DataFrame:
         """Get feature importance scores.
@@ -314,41 +622,119 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
         else:
             kfold = KFold(n_splits=cv, shuffle=True, random_state=42)
 
-        scores: Dict[str, List[float]] = {
-            "csmf_accuracy": [],
-            "cod_accuracy": [],
-        }
+        csmf_scores = np.empty(cv, dtype=np.float64)
+        cod_scores = np.empty(cv, dtype=np.float64)
 
-        for fold, (train_idx, val_idx) in enumerate(kfold.split(X, y)):
-            logger.info(f"Processing fold {fold + 1}/{cv}")
+        # Encode labels and convert features once; folds index into them
+        y_encoded, classes = self._factorize_labels(y)
+        if self.config.num_class is None:
+            self.config.num_class = len(classes)
 
-            X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-            y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
+        data = self._to_float32(X)
+        if self._is_sparse(data):
+            data = self._to_csr(data)
+        params = self._get_xgb_params()
+        use_quantile = params.get("tree_method") == "hist"
+
+        # On CPU, folds train concurrently (xgb.train releases the GIL), so
+        # split the cores between them; on GPU they run one after another so
+        # they do not compete for the same device
+        on_gpu = params.get("device", "cpu").startswith(("cuda", "gpu"))
+        n_fold_jobs = 1 if on_gpu else cv
+        fold_threads = max(1, default_nthread() // n_fold_jobs)
+        if self.config.n_jobs and self.config.n_jobs > 0:
+            fold_threads = min(fold_threads, self.config.n_jobs)
+        fold_config = self.config.model_copy(update={"n_jobs": fold_threads})
+
+        fold_scores = Parallel(n_jobs=n_fold_jobs, backend="threading")(
+            delayed(self._fit_one_fold)(
+                data, X.columns.tolist(), y, y_encoded, classes, fold_config,
+                use_quantile, fold, train_idx, val_idx,
+            )
+            for fold, (train_idx, val_idx) in enumerate(kfold.split(X, y))
+        )
+        for fold, (csmf_acc, cod_acc) in enumerate(fold_scores):
+            csmf_scores[fold] = csmf_acc
+            cod_scores[fold] = cod_acc
 
-            # Clone model for this fold
-            model = XGBoostModel(config=self.config)
-            model.fit(X_train, y_train, eval_set=[(X_val, y_val)])
+        # Return mean scores
+        return {
+            "csmf_accuracy_mean": csmf_scores.mean(),
+            "csmf_accuracy_std": csmf_scores.std(),
+            "cod_accuracy_mean": cod_scores.mean(),
+            "cod_accuracy_std": cod_scores.std(),
+            "csmf_accuracy_scores": csmf_scores.tolist(),
+            "cod_accuracy_scores": cod_scores.tolist(),
+        }
 
-            # Calculate metrics
-            y_pred = model.predict(X_val)
+    def _fit_one_fold(
+        self,
+        data: Union[np.ndarray, sp.csr_matrix],
+        feature_names: List[str],
+        y: pd.Series,
+        y_encoded: np.ndarray,
+        classes: np.ndarray,
+        fold_config: XGBoostConfig,
+        use_quantile: bool,
+        fold: int,
+        train_idx: np.ndarray,
+        val_idx: np.ndarray,
+    ) -> Tuple[float, float]:
+        """Train and score one cross-validation fold.
 
-            # CSMF accuracy
-            csmf_acc = self.calculate_csmf_accuracy(y_val, y_pred)
-            scores["csmf_accuracy"].append(csmf_acc)
+        Args:
+            data: Features for all samples (dense or CSR)
+            feature_names: Feature names
+            y: Labels for all samples
+            y_encoded: Encoded labels for all samples
+            classes: Sorted class labels, indexed by encoded label
+            fold_config: Configuration for the fold model
+            use_quantile: Build QuantileDMatrix objects (hist tree method)
+            fold: Zero-based fold number, for logging
+            train_idx: Training sample indices
+            val_idx: Validation sample indices
 
-            # COD accuracy
-            cod_acc = (y_val == y_pred).mean()
-            scores["cod_accuracy"].append(cod_acc)
+        Returns:
+            Tuple of (CSMF accuracy, COD accuracy) on the validation set
+        """
+        logger.info(f"Processing fold {fold + 1}")
+
+        y_val = y.iloc[val_idx]
+
+        # Clone model for this fold
+        model = XGBoostModel(config=fold_config)
+        model.feature_names_ = feature_names
+        model.classes_ = classes
+
+        # QuantileDMatrix cannot be sliced, so each fold builds its own
+        # training matrix; the validation matrix reuses its bins via ref
+        dtrain = model._make_train_dmatrix(
+            data[train_idx],
+            y_encoded[train_idx],
+            weight=self._default_sample_weight(y_encoded[train_idx]),
+            quantile=use_quantile,
+        )
+        dval = model._make_train_dmatrix(
+            data[val_idx], y_encoded[val_idx], quantile=use_quantile, ref=dtrain
+        )
+        model.fit_from_dmatrix(dtrain, evals=[(dval, "eval_0")])
+
+        # Calculate metrics
+        # multi:softmax returns class indices, multi:softprob probabilities
+        raw_pred = model.model_.predict(dval)
+        class_indices = (
+            raw_pred.astype(int) if raw_pred.ndim == 1
+            else np.argmax(raw_pred, axis=1)
+        )
+        y_pred = classes[class_indices]
 
-        # Return mean scores
-        return {
-            "csmf_accuracy_mean": np.mean(scores["csmf_accuracy"]),
-            "csmf_accuracy_std": np.std(scores["csmf_accuracy"]),
-            "cod_accuracy_mean": np.mean(scores["cod_accuracy"]),
-            "cod_accuracy_std": np.std(scores["cod_accuracy"]),
-            "csmf_accuracy_scores": scores["csmf_accuracy"],
-            "cod_accuracy_scores": scores["cod_accuracy"],
-        }
+        # CSMF accuracy
+        csmf_acc = self.calculate_csmf_accuracy(y_val, y_pred)
+
+        # COD accuracy, compared on the encoded labels
+        cod_acc = float(np.mean(class_indices == y_encoded[val_idx]))
+
+        return csmf_acc, cod_acc
 
     def calculate_csmf_accuracy(self, y_true: pd.Series, y_pred: np.ndarray) -> float:
         """Calculate CSMF accuracy following InSilicoVA implementation.
@@ -365,24 +751,19 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
         Returns:
             CSMF accuracy score between 0 and 1
         """
-        # Get true and predicted fractions
-        true_fractions = y_true.value_counts(normalize=True)
-        pred_fractions = pd.Series(y_pred).value_counts(normalize=True)
-
-        # Align categories
-        all_categories = list(set(true_fractions.index) | set(pred_fractions.index))
-        true_fractions = true_fractions.reindex(all_categories, fill_value=0)
-        pred_fractions = pred_fractions.reindex(all_categories, fill_value=0)
-
-        # Calculate CSMF accuracy
-        diff = np.abs(true_fractions - pred_fractions).sum()
-        min_frac = true_fractions.min()
-
-        # Handle edge case where min_frac = 1 (single class)
-        if min_frac == 1:
-            return 1.0 if diff == 0 else 0.0
+        # Encode both label sets against their union of categories
+        true_values = np.asarray(y_true)
+        categories, codes = np.unique(
+            np.concatenate([true_values, np.asarray(y_pred)]), return_inverse=True
+        )
+        n_true = len(true_values)
 
-        csmf_accuracy = 1 - diff / (2 * (1 - min_frac))
+        # Calculate CSMF accuracy; causes only predicted count as a 0 true
+        # fraction, and a single class scores 1 (compiled with Numba when
+        # available)
+        csmf_accuracy = csmf_accuracy_from_codes(
+            codes[:n_true], codes[n_true:], len(categories)
+        )
 
         return max(0, csmf_accuracy)  # Ensure non-negative
 
@@ -392,6 +773,16 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
         Returns:
             Dictionary of XGBoost parameters
         """
+        device = resolve_device(self.config.device)
+        tree_method = self.config.tree_method
+        if self.config.device == "auto" and device == "cuda":
+            # XGBoost >= 2.0 selects the GPU via device; hist is its GPU method
+            tree_method = "hist"
+
+        # Non-positive n_jobs means auto; cap at physical cores
+        n_jobs = self.config.n_jobs
+        nthread = n_jobs if n_jobs and n_jobs > 0 else default_nthread()
+
         params = {
             "objective": self.config.objective,
             "num_class": self.config.num_class,
@@ -399,9 +790,9 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
             "learning_rate": self.config.learning_rate,
             "subsample": self.config.subsample,
             "colsample_bytree": self.config.colsample_bytree,
-            "tree_method": self.config.tree_method,
-            "device": self.config.device,
-            "nthread": self.config.n_jobs,
+            "tree_method": tree_method,
+            "device": device,
+            "nthread": nthread,
             "reg_alpha": self.config.reg_alpha,
             "reg_lambda": self.config.reg_lambda,
             "eval_metric": "mlogloss",
@@ -411,14 +802,8 @@ class XGBoostModel(BaseEstimator, ClassifierMixin):
         # Remove None values
         params = {k: v for k, v in params.items() if v is not None}
 
-        # Handle class weights for imbalanced data
-        if self.config.scale_pos_weight is not None:
-            # XGBoost doesn't directly support per-class weights in multi-class
-            # We'll need to use sample weights instead
-            logger.warning(
-                "scale_pos_weight not directly supported for multi-class; "
-                "use sample_weight in fit()"
-            )
+        # Per-class weights (scale_pos_weight) are applied as sample weights
+        # in fit(), since XGBoost has no multi-class equivalent
 
         return params
 
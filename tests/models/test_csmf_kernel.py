@@ -0,0 +1,40 @@
+"""Tests for the CSMF accuracy kernel."""
+
+import numpy as np
+import pytest
+
+from baseline.models import csmf_kernel
+from baseline.models.csmf_kernel import csmf_accuracy_from_codes
+
+
+def test_perfect_prediction_scores_one():
+    """Identical cause distributions give a CSMF accuracy of 1."""
+    codes = np.array([0, 1, 1, 2, 2, 2])
+    assert csmf_accuracy_from_codes(codes, codes[::-1], 3) == pytest.approx(1.0)
+
+
+def test_cause_only_in_predictions():
+    """A cause absent from the true labels counts as a true fraction of 0."""
+    codes_true = np.array([0, 0, 1, 1])
+    codes_pred = np.array([0, 1, 2, 2])
+
+    # |0.25 - 0.5| + |0.25 - 0.5| + |0.5 - 0| = 1, denominator 2 * (1 - 0)
+    assert csmf_accuracy_from_codes(codes_true, codes_pred, 3) == pytest.approx(0.5)
+
+
+def test_single_class_scores_one():
+    """With a single cause the denominator is zero and the score is 1."""
+    codes = np.zeros(5, dtype=np.int64)
+    assert csmf_accuracy_from_codes(codes, codes, 1) == 1.0
+
+
+@pytest.mark.skipif(not csmf_kernel.NUMBA_AVAILABLE, reason="numba not installed")
+def test_numba_matches_numpy():
+    """The compiled and NumPy kernels agree on random labels."""
+    rng = np.random.default_rng(0)
+    for n_causes in (2, 5, 34):
+        codes_true = rng.integers(0, n_causes, size=200)
+        codes_pred = rng.integers(0, n_causes, size=200)
+        expected = csmf_kernel._csmf_accuracy_numpy(codes_true, codes_pred, n_causes)
+        actual = csmf_kernel._csmf_accuracy_numba(codes_true, codes_pred, n_causes)
+        assert actual == pytest.approx(expected)
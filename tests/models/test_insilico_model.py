@@ -0,0 +1,151 @@
+"""Tests for the InSilicoVA model helpers that run without Docker."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseline.models.insilico_io import to_csv_bytes
+from baseline.models.insilico_model import InSilicoVAModel
+from baseline.models.model_config import InSilicoVAConfig
+
+CAUSES = ["c0", "c1", "c2"]
+
+
+def make_model(**config_kwargs):
+    """Fit a model on a small dataset whose first symptom encodes the cause."""
+    rng = np.random.default_rng(0)
+    n_samples = 30
+    codes = np.arange(n_samples) % len(CAUSES)
+    X = pd.DataFrame({
+        "s0": codes.astype(float),
+        "s1": rng.integers(0, 2, size=n_samples).astype(float),
+    })
+    y = pd.Series(np.asarray(CAUSES)[codes])
+    return InSilicoVAModel(InSilicoVAConfig(**config_kwargs)).fit(X, y)
+
+
+def one_hot(codes):
+    """Probability frame with all mass on the given cause codes."""
+    return pd.DataFrame(np.eye(len(CAUSES))[codes], columns=CAUSES)
+
+
+def test_deduplicate_and_combine_restore_row_order():
+    """Probabilities of unique rows are scattered back to every input row."""
+    model = make_model(deduplicate_rows=True)
+    X = pd.DataFrame({"s0": [0.0, 1.0, 0.0, 2.0, 1.0], "s1": [0.0] * 5})
+
+    X_unique, inverse = model._deduplicate_rows(X)
+    assert len(X_unique) == 3
+
+    # Each unique row predicts the cause encoded in s0, returned in two shards
+    probs_df = one_hot(X_unique["s0"].astype(int).to_numpy())
+    probs = model._combine_probabilities([probs_df.iloc[:2], probs_df.iloc[2:]], inverse)
+
+    assert probs.shape == (5, len(CAUSES))
+    np.testing.assert_array_equal(probs.argmax(axis=1), X["s0"].astype(int))
+
+
+def test_deduplicate_disabled_returns_input():
+    """Without deduplication the input frame is passed through unchanged."""
+    model = make_model()
+    X = pd.DataFrame({"s0": [0.0, 0.0], "s1": [1.0, 1.0]})
+
+    X_unique, inverse = model._deduplicate_rows(X)
+
+    assert X_unique is X
+    assert inverse is None
+
+
+def test_split_into_shards_single_shard_is_input():
+    """A single shard is the input frame itself, not a copy."""
+    model = make_model()
+    X = pd.DataFrame({"s0": np.zeros(10), "s1": np.ones(10)})
+
+    shards = model._split_into_shards(X)
+
+    assert len(shards) == 1
+    assert shards[0] is X
+
+
+def test_split_into_shards_covers_rows_in_order(monkeypatch):
+    """Shards are contiguous, balanced and together cover every row."""
+    monkeypatch.setattr("os.cpu_count", lambda: 16)
+    model = make_model(num_shards=3, min_shard_size=1)
+    X = pd.DataFrame({"s0": np.arange(10.0), "s1": np.zeros(10)})
+
+    shards = model._split_into_shards(X)
+
+    assert [len(shard) for shard in shards] == [3, 3, 4]
+    pd.testing.assert_frame_equal(pd.concat(shards), X)
+
+
+def test_format_probabilities_aligns_and_normalizes():
+    """Missing causes are zero-filled, columns reordered and rows normalized."""
+    model = make_model()
+    probs_df = pd.DataFrame({"c2": [1.0, 0.0], "c0": [1.0, 0.0]})
+
+    probs = model._format_probabilities(probs_df)
+
+    assert probs.dtype == np.float32
+    np.testing.assert_allclose(probs[0], [0.5, 0.0, 0.5])
+    # Rows summing to zero stay zero instead of becoming NaN
+    np.testing.assert_array_equal(probs[1], [0.0, 0.0, 0.0])
+
+
+def test_format_probabilities_float64():
+    """The configured probability dtype is used for the output."""
+    model = make_model(probability_dtype="float64")
+
+    probs = model._format_probabilities(one_hot([0, 1]))
+
+    assert probs.dtype == np.float64
+
+
+def test_format_probabilities_requires_fit():
+    """Formatting probabilities before fit raises."""
+    model = InSilicoVAModel()
+    with pytest.raises(RuntimeError):
+        model._format_probabilities(one_hot([0]))
+
+
+def test_to_csv_bytes_writes_missing_as_empty():
+    """NaN symptoms and an absent cause column are written as empty fields."""
+    X = pd.DataFrame({"s0": [1.0, np.nan], "s1": [np.nan, 0.0]})
+
+    csv = pd.read_csv(
+        io.BytesIO(to_csv_bytes(X, "va34")), dtype=str, keep_default_na=False
+    )
+
+    assert csv.columns.tolist() == ["s0", "s1", "va34"]
+    assert csv.loc[1, "s0"] == ""
+    assert csv.loc[0, "s1"] == ""
+    assert csv["va34"].tolist() == ["", ""]
+
+
+def test_to_csv_bytes_writes_causes():
+    """Training causes are written to the cause column."""
+    X = pd.DataFrame({"s0": [1.0, 0.0]})
+
+    csv = pd.read_csv(
+        io.BytesIO(to_csv_bytes(X, "va34", pd.Series(["a", "b"]))), dtype=str
+    )
+
+    assert csv["va34"].tolist() == ["a", "b"]
+
+
+def test_r_params_dcf_round_trips_and_tracks_config():
+    """R parameters are one DCF record and follow config changes."""
+    model = make_model(n_chains=2)
+
+    params = dict(
+        line.split(": ", 1) for line in model._r_params_dcf.splitlines()
+    )
+
+    assert params["n_chains"] == "2"
+    assert params["burnin"] == "2000"
+    assert params["nsim_per_chain"] == str(2000 + (10000 - 2000) // 2)
+
+    model.config = InSilicoVAConfig(nsim=20000)
+    assert "nsim: 20000\n" in model._r_params_dcf
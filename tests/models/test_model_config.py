@@ -0,0 +1,29 @@
+"""Tests for the InSilicoVA configuration."""
+
+import pytest
+
+from baseline.models.model_config import InSilicoVAConfig, make_insilico_config
+
+
+def test_make_insilico_config_reuses_instances():
+    """Equal arguments share one config; different arguments do not."""
+    config = make_insilico_config(nsim=5000, random_seed=1)
+
+    assert make_insilico_config(nsim=5000, random_seed=1) is config
+    assert make_insilico_config(nsim=5000, random_seed=2) is not config
+
+
+def test_config_is_frozen():
+    """Configs cannot be modified in place."""
+    config = InSilicoVAConfig()
+    with pytest.raises(ValueError):
+        config.nsim = 20000
+
+
+def test_chains_must_run_past_burnin():
+    """Each chain must run more iterations than the burn-in."""
+    with pytest.raises(ValueError):
+        InSilicoVAConfig(nsim=10000, n_chains=5)
+
+    config = InSilicoVAConfig(nsim=10000, n_chains=4)
+    assert config.get_r_script_params()["nsim_per_chain"] == 4000
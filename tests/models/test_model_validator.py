@@ -0,0 +1,116 @@
+"""Tests for the InSilicoVA data validator."""
+
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseline.models.model_config import InSilicoVAConfig
+from baseline.models.model_validator import InSilicoVAValidator
+
+
+@pytest.fixture
+def validator():
+    return InSilicoVAValidator(InSilicoVAConfig())
+
+
+@pytest.fixture
+def training_data():
+    """Twelve samples with three causes of four samples each."""
+    X = pd.DataFrame({
+        "s0": np.tile([0.0, 1.0], 6),
+        "s1": np.repeat([0.0, 1.0], 6),
+    })
+    y = pd.Series(np.repeat(["a", "b", "c"], 4))
+    return X, y
+
+
+def test_cache_hit_on_same_objects(validator, training_data):
+    """Validating the same objects again returns the cached result."""
+    X, y = training_data
+
+    first = validator.validate_training_data(X, y)
+
+    assert validator.validate_training_data(X, y) is first
+
+
+def test_cache_miss_after_shape_change(validator, training_data):
+    """Adding a column in place invalidates the cached result."""
+    X, y = training_data
+    first = validator.validate_training_data(X, y)
+
+    X["s2"] = 0.0
+    second = validator.validate_training_data(X, y)
+
+    assert second is not first
+    assert second.metadata["n_features"] == 3
+
+
+def test_cache_miss_after_dtype_change(validator, training_data):
+    """Changing a column dtype in place invalidates the cached result."""
+    X, y = training_data
+    first = validator.validate_training_data(X, y)
+
+    X["s0"] = X["s0"].astype(np.int64)
+
+    assert validator.validate_training_data(X, y) is not first
+
+
+def test_no_stale_hit_after_garbage_collection(validator, monkeypatch):
+    """A result is not reused for a new object once the old one is collected."""
+    # Force identical cache keys so only the weak references tell objects apart
+    monkeypatch.setattr(
+        InSilicoVAValidator, "_fingerprint", staticmethod(lambda *data: ("same",))
+    )
+    X_old = pd.DataFrame({"s0": [1.0, 0.0]})
+    first = validator.validate_prediction_data(X_old)
+    del X_old
+    gc.collect()
+
+    X_new = pd.DataFrame({"s0": [np.nan, np.nan]})
+    second = validator.validate_prediction_data(X_new)
+
+    assert second is not first
+    assert second.metadata["all_na_columns"] == ["s0"]
+
+
+def test_int64_target_has_no_type_warning(validator, training_data):
+    """Integer cause codes are valid without a conversion warning."""
+    X, _ = training_data
+    y = pd.Series(np.repeat([1, 2, 3], 4), dtype=np.int64)
+
+    result = validator.validate_training_data(X, y)
+
+    assert result.is_valid
+    assert not any("non-string" in warning for warning in result.warnings)
+
+
+def test_float_target_warns(validator, training_data):
+    """Float cause labels produce a conversion warning."""
+    X, _ = training_data
+    y = pd.Series(np.repeat([1.0, 2.0, 3.0], 4))
+
+    result = validator.validate_training_data(X, y)
+
+    assert any("non-string" in warning for warning in result.warnings)
+
+
+def test_cause_distribution(validator, training_data):
+    """cause_distribution reports the number of samples per cause."""
+    X, y = training_data
+
+    result = validator.validate_training_data(X, y)
+
+    assert result.cause_distribution == {"a": 4, "b": 4, "c": 4}
+    assert validator.validate_prediction_data(X).cause_distribution == {}
+
+
+def test_column_compatibility(validator):
+    """Missing test columns are errors and extra ones are warnings."""
+    result = validator.validate_column_compatibility(["a", "b"], ["b", "c"])
+
+    assert not result.is_valid
+    assert result.metadata["missing_in_test"] == ["a"]
+    assert result.metadata["extra_in_test"] == ["c"]
+    assert validator.validate_column_compatibility(["a", "b"], ["b", "a"]).is_valid
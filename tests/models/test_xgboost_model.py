@@ -0,0 +1,70 @@
+"""Tests for the XGBoost model."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseline.models.xgboost_config import XGBoostConfig
+from baseline.models.xgboost_model import XGBoostModel
+
+
+@pytest.fixture
+def va_data():
+    """Small synthetic VA dataset with binary symptoms and three causes."""
+    rng = np.random.default_rng(0)
+    n_samples = 150
+    y = pd.Series(rng.choice(["cause_a", "cause_b", "cause_c"], size=n_samples))
+    X = pd.DataFrame(
+        rng.integers(0, 2, size=(n_samples, 8)).astype(float),
+        columns=[f"symptom_{i}" for i in range(8)],
+    )
+    # Make the first symptom informative
+    X["symptom_0"] = (y == "cause_a").astype(float)
+    return X, y
+
+
+def test_cross_validate_default_config(va_data):
+    """cross_validate runs with the default (hist) configuration."""
+    X, y = va_data
+    model = XGBoostModel()
+
+    results = model.cross_validate(X, y, cv=3)
+
+    assert len(results["csmf_accuracy_scores"]) == 3
+    assert len(results["cod_accuracy_scores"]) == 3
+    assert 0 <= results["csmf_accuracy_mean"] <= 1
+    assert 0 <= results["cod_accuracy_mean"] <= 1
+
+
+def test_cross_validate_rejects_single_fold(va_data):
+    """cross_validate requires at least two folds."""
+    X, y = va_data
+    with pytest.raises(ValueError):
+        XGBoostModel().cross_validate(X, y, cv=1)
+
+
+def test_cross_validate_non_hist_tree_method(va_data):
+    """cross_validate also works with plain DMatrix folds."""
+    X, y = va_data
+    model = XGBoostModel(config=XGBoostConfig(tree_method="approx"))
+
+    results = model.cross_validate(X, y, cv=3)
+
+    assert len(results["csmf_accuracy_scores"]) == 3
+
+
+def test_fit_rejects_eval_set_with_reordered_columns(va_data):
+    """Eval frames must have the training columns in the same order."""
+    X, y = va_data
+    X_eval = X[X.columns[::-1]]
+    with pytest.raises(ValueError):
+        XGBoostModel().fit(X, y, eval_set=[(X_eval, y)])
+
+
+def test_fit_rejects_missing_labels(va_data):
+    """Missing labels raise a clear error instead of failing inside XGBoost."""
+    X, y = va_data
+    y = y.copy()
+    y.iloc[0] = None
+    with pytest.raises(ValueError, match="missing labels"):
+        XGBoostModel().fit(X, y)